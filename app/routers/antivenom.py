@@ -79,12 +79,35 @@ async def find_antivenom(request: AntivenomFinderRequest):
         
         # CASE 1: Mobile App - Search by Snake (after identification)
         if request.snake_id or request.snake_common_name:
-            # Step 1: Get snake_id if common name provided
             snake_id = request.snake_id
-            
+
             if request.snake_common_name and not snake_id:
+                # Combined lookup: name resolution and facility search in a
+                # single round trip instead of two sequential queries
                 try:
-                    snake_info = await db_manager.get_snake_by_common_name(request.snake_common_name)
+                    facilities_data = await db_manager.find_facilities_by_common_name(
+                        request.snake_common_name
+                    )
+                except Exception as e:
+                    logger.error(f"Error finding facilities: {e}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail="Failed to find facilities with antivenom"
+                    )
+
+                if facilities_data:
+                    snake_id = facilities_data[0].get("snake_id")
+                else:
+                    # Empty result is ambiguous: distinguish an unknown snake
+                    # (404) from a known snake with nothing in stock (200)
+                    try:
+                        snake_info = await db_manager.get_snake_by_common_name(request.snake_common_name)
+                    except Exception as e:
+                        logger.error(f"Error looking up snake: {e}")
+                        raise HTTPException(
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Failed to lookup snake species"
+                        )
                     if snake_info:
                         snake_id = snake_info["snake_id"]
                     else:
@@ -92,26 +115,18 @@ async def find_antivenom(request: AntivenomFinderRequest):
                             status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Snake species '{request.snake_common_name}' not found in database"
                         )
-                except HTTPException:
-                    raise
+            else:
+                # snake_id provided directly - single facility query
+                logger.info(f"Finding facilities with antivenom for snake_id: {snake_id}")
+
+                try:
+                    facilities_data = await db_manager.get_facilities_with_antivenom(snake_id)
                 except Exception as e:
-                    logger.error(f"Error looking up snake: {e}")
+                    logger.error(f"Error finding facilities: {e}")
                     raise HTTPException(
                         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Failed to lookup snake species"
+                        detail="Failed to find facilities with antivenom"
                     )
-            
-            # Step 2: Find facilities with antivenom for this snake
-            logger.info(f"Finding facilities with antivenom for snake_id: {snake_id}")
-            
-            try:
-                facilities_data = await db_manager.get_facilities_with_antivenom(snake_id)
-            except Exception as e:
-                logger.error(f"Error finding facilities: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to find facilities with antivenom"
-                )
         
         # CASE 2: Staff Web App - Search by Antivenom Type
         elif request.antivenom_type:
@@ -160,23 +175,40 @@ async def find_antivenom(request: AntivenomFinderRequest):
         
         facilities_with_distance = []
         osrm_client = get_osrm_client()
-        
-        # Process facilities and calculate distances
+
+        # Skip facilities without coordinates, then resolve all remaining
+        # routes in one batched OSRM table lookup instead of one /route
+        # round-trip per facility
+        routable = []
         for facility_data in facilities_data:
+            if not facility_data.get("latitude") or not facility_data.get("longitude"):
+                logger.warning(f"Facility {facility_data.get('facility_name')} has no coordinates")
+                continue
+            routable.append(facility_data)
+
+        # Straight-line pre-filter: a route is never shorter than the
+        # great-circle distance, so facilities beyond the max distance in
+        # Haversine terms cannot pass the route filter below - drop them
+        # before they cost OSRM work
+        if request.max_distance_km and routable:
+            straight_km = osrm_client.haversine_bulk(
+                request.user_latitude, request.user_longitude,
+                [f["latitude"] for f in routable],
+                [f["longitude"] for f in routable]
+            )
+            routable = [
+                f for f, km in zip(routable, straight_km)
+                if km <= request.max_distance_km
+            ]
+
+        route_infos = await osrm_client.get_routes_with_fallback_one_to_many(
+            request.user_latitude,
+            request.user_longitude,
+            [(f["latitude"], f["longitude"]) for f in routable]
+        )
+
+        for facility_data, route_info in zip(routable, route_infos):
             try:
-                # Skip facilities without coordinates
-                if not facility_data.get("latitude") or not facility_data.get("longitude"):
-                    logger.warning(f"Facility {facility_data.get('facility_name')} has no coordinates")
-                    continue
-                
-                # Calculate route info
-                route_info = await osrm_client.get_route_with_fallback(
-                    request.user_latitude,
-                    request.user_longitude,
-                    facility_data["latitude"],
-                    facility_data["longitude"]
-                )
-                
                 # Filter by max distance if specified
                 if (request.max_distance_km and 
                     route_info.get("distance_km") and 
@@ -378,24 +410,44 @@ async def get_facilities_with_antivenom(request: FacilityListRequest):
         # Step 3: Calculate distances for each facility
         facilities_with_distance = []
         osrm_client = get_osrm_client()
-        
-        for facility_id, group_data in facility_groups.items():
+
+        # Skip facilities without coordinates, then resolve all remaining
+        # routes in one batched OSRM table lookup
+        routable_groups = []
+        for group_data in facility_groups.values():
+            facility_data = group_data["facility_data"]
+            if not facility_data.get("latitude") or not facility_data.get("longitude"):
+                logger.warning(f"Facility {facility_data.get('facility_name')} has no coordinates")
+                continue
+            routable_groups.append(group_data)
+
+        # Straight-line pre-filter, same reasoning as in find_antivenom:
+        # anything past max_distance_km in Haversine terms cannot survive
+        # the route filter, so skip the OSRM work for it
+        if request.max_distance_km and routable_groups:
+            straight_km = osrm_client.haversine_bulk(
+                request.user_latitude, request.user_longitude,
+                [g["facility_data"]["latitude"] for g in routable_groups],
+                [g["facility_data"]["longitude"] for g in routable_groups]
+            )
+            routable_groups = [
+                g for g, km in zip(routable_groups, straight_km)
+                if km <= request.max_distance_km
+            ]
+
+        route_infos = await osrm_client.get_routes_with_fallback_one_to_many(
+            request.user_latitude,
+            request.user_longitude,
+            [
+                (g["facility_data"]["latitude"], g["facility_data"]["longitude"])
+                for g in routable_groups
+            ]
+        )
+
+        for group_data, route_info in zip(routable_groups, route_infos):
             try:
                 facility_data = group_data["facility_data"]
-                
-                # Skip facilities without coordinates
-                if not facility_data.get("latitude") or not facility_data.get("longitude"):
-                    logger.warning(f"Facility {facility_data.get('facility_name')} has no coordinates")
-                    continue
-                
-                # Calculate route info
-                route_info = await osrm_client.get_route_with_fallback(
-                    request.user_latitude,
-                    request.user_longitude,
-                    facility_data["latitude"],
-                    facility_data["longitude"]
-                )
-                
+
                 # Filter by max distance if specified
                 if (request.max_distance_km and 
                     route_info.get("distance_km") and 
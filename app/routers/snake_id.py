@@ -3,15 +3,18 @@ Snake identification router for VenomX API.
 Handles image upload, snake detection, classification, and database lookup.
 """
 
+import asyncio
 import logging
 import os
+import tempfile
 import time
 from typing import Optional
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.models.schemas import SnakeIdResponse, ErrorResponse
 from app.utils.detector import get_detector, cleanup_temp_files
+from app.utils.detector_batcher import get_detector_batcher
 from app.utils.classifier import get_classifier
 from app.utils.db import db_manager
 from app.utils.config import settings
@@ -296,18 +299,29 @@ async def get_model_info():
 @router.get(
     "/snakes",
     summary="Get all snakes from database",
-    description="Retrieve all snake species from the database"
+    description="Retrieve all snake species from the database. "
+                "Returns a narrow column set for pickers by default; "
+                "pass `fields` to request additional columns (e.g. description, image_url)."
 )
-async def get_all_snakes():
+async def get_all_snakes(
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated subset of snake columns to return"
+    )
+):
     """Get all snakes from the database"""
     try:
-        snakes = await db_manager.get_all_snakes()
-        
-        return {
+        field_list = [f.strip() for f in fields.split(",")] if fields else None
+        snakes = await db_manager.get_all_snakes(fields=field_list)
+
+        # Return the records as-is; orjson handles date/datetime natively,
+        # so skipping FastAPI's jsonable_encoder pass avoids re-walking the
+        # whole list per request
+        return ORJSONResponse({
             "success": True,
             "count": len(snakes),
             "snakes": snakes
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error retrieving snakes: {e}")
@@ -320,19 +334,28 @@ async def get_all_snakes():
 @router.get(
     "/snakes/with-antivenom",
     summary="Get snakes that have antivenom available",
-    description="Retrieve only snake species that have at least one antivenom linked (regardless of stock)"
+    description="Retrieve only snake species that have at least one antivenom linked (regardless of stock). "
+                "Returns a narrow column set for the dropdown by default; "
+                "pass `fields` to request additional columns."
 )
-async def get_snakes_with_antivenom():
+async def get_snakes_with_antivenom(
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated subset of snake columns to return"
+    )
+):
     """Get snakes that have antivenom available (for dropdown in antivenom finder)"""
     try:
-        snakes = await db_manager.get_snakes_with_antivenom()
-        
-        return {
+        field_list = [f.strip() for f in fields.split(",")] if fields else None
+        snakes = await db_manager.get_snakes_with_antivenom(fields=field_list)
+
+        # Records go straight to orjson - no jsonable_encoder re-walk
+        return ORJSONResponse({
             "success": True,
             "count": len(snakes),
             "snakes": snakes,
             "message": f"Found {len(snakes)} snake species with antivenom available"
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error retrieving snakes with antivenom: {e}")
@@ -398,19 +421,17 @@ async def test_snake_model(image: UploadFile = File(...)):
             "snake_info": None
         }
         
-        # Get detector and classifier
-        detector = get_detector()
+        # Get classifier (detection goes through the shared micro-batcher)
         classifier = get_classifier()
         
         # Save temporary image
-        import tempfile
         with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
             temp_file.write(image_data)
             temp_path = temp_file.name
         
         try:
-            # Detect snake
-            detection_result = detector.detect_snake(temp_path)
+            # Detect snake - concurrent uploads share one batched forward pass
+            detection_result = await get_detector_batcher().detect_snake(temp_path)
             
             if detection_result["success"] and detection_result["detections"]:
                 result["detection_success"] = True
@@ -424,11 +445,14 @@ async def test_snake_model(image: UploadFile = File(...)):
                     "y2": int(best_detection["bbox"][3])
                 }
                 
-                # Get cropped image path
-                cropped_path = best_detection["cropped_image_path"]
-                
-                # Classify the cropped snake
-                classification_result = classifier.classify_snake(cropped_path)
+                # Get the cropped image (in-memory; debug file as fallback)
+                crop = best_detection.get("cropped_image")
+                if crop is None:
+                    crop = best_detection["cropped_image_path"]
+
+                # Classify the cropped snake off the event loop - the
+                # forward pass is tens of milliseconds of pure CPU/GPU work
+                classification_result = await asyncio.to_thread(classifier.classify, crop)
                 
                 if classification_result["success"]:
                     species_raw = classification_result["predicted_class"]
@@ -441,8 +465,6 @@ async def test_snake_model(image: UploadFile = File(...)):
                     
                     # Try to find in database using the formatted name
                     try:
-                        from app.utils.db import DatabaseManager
-                        
                         # Try different name formats for database lookup
                         possible_names = [
                             species_formatted,  # "Common Mock Viper"
@@ -452,7 +474,7 @@ async def test_snake_model(image: UploadFile = File(...)):
                         
                         snake_info = None
                         for name_variant in possible_names:
-                            snake_info = await DatabaseManager.get_snake_by_common_name(name_variant)
+                            snake_info = await db_manager.get_snake_by_common_name(name_variant)
                             if snake_info:
                                 break
                         
@@ -480,10 +502,12 @@ async def test_snake_model(image: UploadFile = File(...)):
                         }
                 
         finally:
-            # Cleanup temporary files
+            # Cleanup temporary files: only this request's upload and the
+            # crops registered under it - no global sweep that could race
+            # with concurrent requests still using their crops
             try:
                 os.unlink(temp_path)
-                cleanup_temp_files()
+                get_detector().finalize_request(temp_path)
             except:
                 pass
         
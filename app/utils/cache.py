@@ -0,0 +1,91 @@
+"""
+In-process TTL cache for read-mostly lookups.
+Keeps slowly-changing reference data (e.g. snake dropdown lists) out of
+the database on repeat calls; a hit costs a dict lookup instead of a
+round trip.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Async-safe TTL cache with per-key locking to prevent thundering herds"""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._maxsize = maxsize
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None when absent or expired"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key: Hashable, ttl: float, value: Any) -> None:
+        """Store value under key for ttl seconds"""
+        self._store(key, ttl, value)
+
+    def delete(self, key: Hashable) -> None:
+        """Drop a single entry (e.g. so a failed lookup is not pinned)"""
+        self._entries.pop(key, None)
+
+    def _store(self, key: Hashable, ttl: float, value: Any) -> None:
+        if self._maxsize is not None and key not in self._entries:
+            while len(self._entries) >= self._maxsize:
+                # Evict in insertion order - the oldest entries are also the
+                # ones closest to expiring
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        ttl: float,
+        coro_factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached value for key, or run coro_factory to fill it.
+        Concurrent callers on a cold key wait on a per-key lock so the
+        underlying query runs only once.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Re-check after waiting: another caller may have filled the entry
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    return entry[1]
+
+                value = await coro_factory()
+                self._store(key, ttl, value)
+                return value
+        finally:
+            # A lock is only needed while a fill is in flight; dropping it
+            # here keeps _locks from growing with key cardinality (maxsize
+            # bounds only _entries). Callers still queued on this lock hold
+            # their own reference - the worst case is a duplicate fill, not
+            # a correctness issue.
+            self._locks.pop(key, None)
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        """
+        Drop cached entries. With no prefix, clears everything; with a
+        prefix, drops tuple keys whose first element matches (call this
+        from write endpoints that change the underlying data).
+        """
+        if prefix is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == prefix]:
+            del self._entries[key]
@@ -5,8 +5,9 @@ This implementation uses probs.top1 for proper classification results.
 
 import logging
 import os
+import numpy as np
 import torch
-from typing import Dict, Any
+from typing import Dict, Any, Union
 from ultralytics import YOLO
 
 from app.utils.config import settings
@@ -46,28 +47,29 @@ class SnakeClassifier:
             raise
     
     
-    def classify(self, crop_path: str) -> Dict[str, Any]:
+    def classify(self, crop: Union[str, np.ndarray]) -> Dict[str, Any]:
         """
         Classify snake species from cropped image.
         Uses probs.top1 and probs.top1conf for proper classification results.
-        
+
         Args:
-            crop_path: Path to the cropped snake image
-            
+            crop: Cropped snake image as an in-memory BGR array (as produced
+                  by the detector) or a path to a crop on disk
+
         Returns:
             Dict containing classification results
         """
         try:
-            if not os.path.exists(crop_path):
+            if isinstance(crop, str) and not os.path.exists(crop):
                 return {
                     "success": False,
                     "error": "Cropped image not found",
                     "predicted_class": None,
                     "confidence": 0.0
                 }
-            
-            # Run classification
-            cls_results = self.model.predict(crop_path)[0]
+
+            # Run classification (ndarray crops skip the disk round trip)
+            cls_results = self.model.predict(crop, verbose=False)[0]
             
             # Check if probs exist (classification results)
             if cls_results.probs is not None:
@@ -3,34 +3,339 @@ Database connection and utility functions for VenomX.
 Handles Supabase/PostgreSQL connection and common database operations.
 """
 
+import asyncio
+import functools
 import logging
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Optional, List, Dict, Any, Sequence
 import asyncpg
-from supabase import create_client, Client
+import httpx
+import orjson
+from supabase import acreate_client, AsyncClient
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 from app.utils.config import settings
+from app.utils.cache import TTLCache
+from app.utils.redis_cache import (
+    FACILITIES_SNAKE_KEY,
+    FACILITIES_CACHE_TTL,
+    cache_get,
+    cache_set,
+)
 
 logger = logging.getLogger(__name__)
 
 # Global database pool
 db_pool: Optional[asyncpg.Pool] = None
-supabase: Optional[Client] = None
+supabase: Optional[AsyncClient] = None
+
+# Caps concurrent acquires at the pool size so load bursts queue gracefully
+# at the app layer instead of raising TooManyConnectionsError
+_pool_semaphore: Optional[asyncio.Semaphore] = None
+
+# In-process cache for slowly-changing reference data (snake lists)
+_result_cache = TTLCache()
+SNAKE_LIST_CACHE_TTL = 300  # seconds
+
+# Allow-list of columns callers may request from the snakes table
+SNAKE_ALLOWED_COLUMNS = (
+    'snake_id', 'scientific_name', 'common_name', 'fang_type',
+    'description', 'danger_level', 'image_url'
+)
+
+# Narrow default for list endpoints (mobile dropdowns/pickers) - omits the
+# large text columns (description, image_url) unless explicitly requested
+SNAKE_DEFAULT_COLUMNS = (
+    'snake_id', 'scientific_name', 'common_name', 'fang_type', 'danger_level'
+)
+
+
+# Hot-path SQL lives at module scope so every call reuses byte-identical
+# query text; asyncpg keys its prepared-statement cache on the text, so a
+# stable string means parse/plan runs once per connection, not per request.
+SQL_SNAKE_BY_COMMON_NAME = """
+    SELECT snake_id, scientific_name, common_name, fang_type,
+           description, danger_level, image_url
+    FROM snakes
+    WHERE common_name ILIKE $1
+    LIMIT 1
+"""
+
+SQL_FACILITIES_BY_SNAKE = """
+    SELECT DISTINCT
+        f.facility_id,
+        f.facility_name,
+        f.facility_type,
+        f.region,
+        f.province,
+        f.city_municipality,
+        f.address,
+        f.latitude,
+        f.longitude,
+        f.contact_number,
+        f.facility_email,
+        a.antivenom_id,
+        a.product_name as antivenom_name,
+        a.manufacturer,
+        fas.quantity,
+        fas.expiration_date,
+        fas.batch_no
+    FROM facilities f
+    JOIN facility_antivenom_stock fas ON f.facility_id = fas.facility_id
+    JOIN antivenoms a ON fas.antivenom_id = a.antivenom_id
+    JOIN antivenom_snake_targets ast ON a.antivenom_id = ast.antivenom_id
+    WHERE ast.snake_id = $1
+    -- AND f.is_verified = true
+    AND fas.quantity > 0
+    AND (fas.expiration_date IS NULL OR fas.expiration_date > CURRENT_DATE)
+    ORDER BY f.facility_name
+"""
+
+SQL_FACILITIES_BY_ANTIVENOM_TYPE = """
+    SELECT DISTINCT
+        f.facility_id,
+        f.facility_name,
+        f.facility_type,
+        f.region,
+        f.province,
+        f.city_municipality,
+        f.address,
+        f.latitude,
+        f.longitude,
+        f.contact_number,
+        f.facility_email,
+        a.antivenom_id,
+        a.product_name as antivenom_name,
+        t.type_name as antivenom_type,
+        a.manufacturer,
+        fas.quantity,
+        fas.expiration_date,
+        fas.batch_no
+    FROM facility_antivenom_stock fas
+    JOIN antivenoms a ON fas.antivenom_id = a.antivenom_id
+    JOIN antivenom_types t ON a.type_id = t.type_id
+    JOIN facilities f ON fas.facility_id = f.facility_id
+    WHERE t.type_name = $1
+    AND fas.quantity > 0
+    AND (fas.expiration_date IS NULL OR fas.expiration_date > CURRENT_DATE)
+    ORDER BY f.facility_name
+"""
+
+SQL_FACILITIES_BY_ANTIVENOM_NAME = """
+    SELECT DISTINCT
+        f.facility_id,
+        f.facility_name,
+        f.facility_type,
+        f.region,
+        f.province,
+        f.city_municipality,
+        f.address,
+        f.latitude,
+        f.longitude,
+        f.contact_number,
+        f.facility_email,
+        a.antivenom_id,
+        a.product_name as antivenom_name,
+        a.manufacturer,
+        fas.quantity,
+        fas.expiration_date,
+        fas.batch_no,
+        ARRAY_AGG(DISTINCT s.scientific_name) as target_snakes
+    FROM facilities f
+    JOIN facility_antivenom_stock fas ON f.facility_id = fas.facility_id
+    JOIN antivenoms a ON fas.antivenom_id = a.antivenom_id
+    JOIN antivenom_snake_targets ast ON a.antivenom_id = ast.antivenom_id
+    JOIN snakes s ON ast.snake_id = s.snake_id
+    WHERE LOWER(a.product_name) ILIKE LOWER($1)
+    -- AND f.is_verified = true
+    AND fas.quantity > 0
+    AND (fas.expiration_date IS NULL OR fas.expiration_date > CURRENT_DATE)
+    GROUP BY f.facility_id, f.facility_name, f.facility_type, f.region,
+             f.province, f.city_municipality, f.address, f.latitude,
+             f.longitude, f.contact_number, f.facility_email,
+             a.antivenom_id, a.product_name, a.manufacturer,
+             fas.quantity, fas.expiration_date, fas.batch_no
+    ORDER BY f.facility_name
+"""
+
+# Combined mobile-flow lookup: resolves the common name and fetches the
+# stocked facilities in one statement (the Supabase fallback uses the
+# find_facilities_by_common_name RPC from migrations/003 for the same shape)
+SQL_FACILITIES_BY_COMMON_NAME = """
+    SELECT DISTINCT
+        s.snake_id,
+        f.facility_id,
+        f.facility_name,
+        f.facility_type,
+        f.region,
+        f.province,
+        f.city_municipality,
+        f.address,
+        f.latitude,
+        f.longitude,
+        f.contact_number,
+        f.facility_email,
+        a.antivenom_id,
+        a.product_name as antivenom_name,
+        a.manufacturer,
+        fas.quantity,
+        fas.expiration_date,
+        fas.batch_no
+    FROM snakes s
+    JOIN antivenom_snake_targets ast ON ast.snake_id = s.snake_id
+    JOIN antivenoms a ON a.antivenom_id = ast.antivenom_id
+    JOIN facility_antivenom_stock fas ON fas.antivenom_id = a.antivenom_id
+    JOIN facilities f ON f.facility_id = fas.facility_id
+    WHERE s.common_name ILIKE $1
+    AND fas.quantity > 0
+    AND (fas.expiration_date IS NULL OR fas.expiration_date > CURRENT_DATE)
+    ORDER BY f.facility_name
+"""
+
+# Column list is interpolated before the query runs, so each distinct
+# projection still gets its own stable cache entry
+SQL_ALL_SNAKES = """
+    SELECT {cols}
+    FROM snakes
+    ORDER BY scientific_name
+"""
+
+SQL_SNAKES_WITH_ANTIVENOM = """
+    SELECT {cols}
+    FROM snakes
+    WHERE snake_id IN (SELECT snake_id FROM antivenom_snake_targets)
+    ORDER BY common_name
+"""
+
+# Preferred source for the antivenom-finder dropdown: the materialized view
+# (migrations/002) precomputes the membership check against
+# antivenom_snake_targets, so serving it is a plain scan of a small relation
+SQL_SNAKES_WITH_ANTIVENOM_MV = """
+    SELECT {cols}
+    FROM mv_snakes_with_antivenom
+    ORDER BY common_name
+"""
+
+
+# App-level concurrency bound across all DatabaseManager calls. A burst of
+# API requests can each fan out into several database calls; without this
+# cap they queue invisibly inside the httpx transport where timeouts are
+# long. Shedding at the app layer keeps P99 bounded and makes backpressure
+# observable (see get_db_concurrency_stats / the /metrics endpoint).
+_db_semaphore = asyncio.Semaphore(settings.db_concurrency)
+
+
+def _bounded(func):
+    """Run a DatabaseManager call under the shared concurrency semaphore"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with _db_semaphore:
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def get_db_concurrency_stats() -> Dict[str, int]:
+    """Concurrency counters for the /metrics endpoint"""
+    return {
+        "limit": settings.db_concurrency,
+        "available": _db_semaphore._value,
+        "in_use": settings.db_concurrency - _db_semaphore._value,
+    }
+
+
+# Retry transient failures only (timeouts, dropped connections) - never 4xx
+# responses or data errors. Exponential backoff with jitter keeps a burst of
+# failed callers from reconnecting in lockstep after an outage.
+_transient_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=1, max=8),
+    retry=retry_if_exception_type((
+        httpx.ReadTimeout,
+        httpx.ConnectError,
+        asyncpg.PostgresConnectionError,
+    )),
+    reraise=True,
+)
+
+
+def _snake_select_columns(fields: Optional[Sequence[str]] = None) -> str:
+    """Build a comma-separated select list from the column allow-list"""
+    cols = ", ".join(f for f in (fields or SNAKE_DEFAULT_COLUMNS) if f in SNAKE_ALLOWED_COLUMNS)
+    return cols or ", ".join(SNAKE_DEFAULT_COLUMNS)
+
+
+async def _init_pool_connection(connection: asyncpg.Connection) -> None:
+    """Per-connection setup: decode jsonb columns with orjson (C) instead of
+    the stdlib json module"""
+    await connection.set_type_codec(
+        'jsonb',
+        encoder=lambda value: orjson.dumps(value).decode(),
+        decoder=orjson.loads,
+        schema='pg_catalog'
+    )
 
 
 async def init_db():
     """Initialize database connections"""
-    global db_pool, supabase
-    
+    global db_pool, supabase, _pool_semaphore
+
     try:
-        # Initialize Supabase client (bypasses RLS with service role key)
-        supabase = create_client(settings.supabase_url, settings.supabase_service_key)
-        logger.info("✅ Supabase client initialized successfully with service role key")
+        # Initialize the async Supabase client (bypasses RLS with service role
+        # key); every caller is async, so the sync client would block the
+        # event loop for the duration of each PostgREST round trip
+        supabase = await acreate_client(settings.supabase_url, settings.supabase_service_key)
+        logger.info("✅ Supabase async client initialized successfully with service role key")
         logger.info("   Service role key bypasses RLS policies automatically")
-        
-        # Note: asyncpg pool not needed - Supabase client handles everything
-        # and properly bypasses RLS policies with the service role key
-        db_pool = None
-        logger.info("   Using Supabase client for all database operations")
-            
+
+        # Give the PostgREST transport a real connection pool - the default
+        # httpx limits are low enough that concurrent endpoints serialize on
+        # fresh TLS handshakes under load
+        try:
+            old_session = supabase.postgrest.session
+            http_client = httpx.AsyncClient(
+                base_url=old_session.base_url,
+                headers=old_session.headers,
+                timeout=old_session.timeout,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=40,
+                    keepalive_expiry=30.0
+                )
+            )
+            supabase.postgrest.session = http_client
+            # Verify the swap actually took effect
+            assert supabase.postgrest.session is http_client
+            logger.info("   PostgREST httpx pool tuned (max=100, keepalive=40, expiry=30s)")
+        except Exception as session_error:
+            logger.warning(f"Could not tune PostgREST connection pool: {session_error}")
+
+        # Initialize the asyncpg pool for the native SQL paths. Sizes come
+        # from settings (db_pool_min/db_pool_max) and are deliberately modest.
+        try:
+            db_pool = await asyncpg.create_pool(
+                settings.database_url,
+                min_size=settings.db_pool_min,
+                max_size=settings.db_pool_max,
+                max_inactive_connection_lifetime=30,
+                statement_cache_size=1024,
+                max_cached_statement_lifetime=300,
+                init=_init_pool_connection
+            )
+            _pool_semaphore = asyncio.Semaphore(settings.db_pool_max)
+            logger.info(
+                f"   asyncpg pool initialized (min={settings.db_pool_min}, "
+                f"max={settings.db_pool_max})"
+            )
+        except Exception as pool_error:
+            db_pool = None
+            _pool_semaphore = None
+            logger.warning(f"asyncpg pool unavailable, using Supabase client only: {pool_error}")
+
     except Exception as e:
         logger.error(f"Failed to initialize Supabase client: {e}")
         raise
@@ -38,19 +343,40 @@ async def init_db():
 
 async def get_db_connection():
     """Get a database connection from the pool"""
-    if supabase is None:
-        raise RuntimeError("Supabase client not initialized")
-    return await db_pool.acquire()
+    if db_pool is None:
+        raise RuntimeError("Database pool not initialized")
+    if _pool_semaphore is not None:
+        await _pool_semaphore.acquire()
+    try:
+        return await db_pool.acquire()
+    except BaseException:
+        if _pool_semaphore is not None:
+            _pool_semaphore.release()
+        raise
 
 
 async def release_db_connection(connection):
     """Release a database connection back to the pool"""
     if db_pool is None:
         raise RuntimeError("Database pool not initialized")
-    await db_pool.release(connection)
+    try:
+        await db_pool.release(connection)
+    finally:
+        if _pool_semaphore is not None:
+            _pool_semaphore.release()
 
 
-def get_supabase_client() -> Client:
+@asynccontextmanager
+async def acquire_connection():
+    """Acquire a pooled connection (semaphore-gated) as an async context manager"""
+    connection = await get_db_connection()
+    try:
+        yield connection
+    finally:
+        await release_db_connection(connection)
+
+
+def get_supabase_client() -> AsyncClient:
     """Get Supabase client instance"""
     if supabase is None:
         raise RuntimeError("Supabase client not initialized")
@@ -58,40 +384,60 @@ def get_supabase_client() -> Client:
 
 
 class DatabaseManager:
-    """Database operations manager using Supabase client (bypasses RLS with service role key)"""
-    
+    """
+    Database operations manager.
+    Reads run as native SQL over the asyncpg pool (non-blocking, no PostgREST
+    hop); the Supabase client remains as a fallback when the pool is down.
+    """
+
     @staticmethod
+    @_transient_retry
+    @_bounded
     async def get_snake_by_common_name(common_name: str) -> Optional[Dict[str, Any]]:
         """
         Get snake information by common name
-        Uses Supabase client with service role key to bypass RLS policies.
-        
+
         Args:
             common_name: Common name of the snake (e.g., "Common Mock Viper")
-            
+
         Returns:
             Snake information dict or None if not found
         """
+        # Primary path: native SQL over the asyncpg pool
+        if db_pool is not None:
+            try:
+                async with acquire_connection() as connection:
+                    row = await connection.fetchrow(SQL_SNAKE_BY_COMMON_NAME, common_name)
+                if row is not None:
+                    logger.debug("Found snake by common name: %s", row['scientific_name'])
+                    return dict(row)
+                logger.warning("No snake found with common name: %s", common_name)
+                return None
+            except Exception as e:
+                logger.error(f"asyncpg snake lookup failed, falling back to Supabase: {e}")
+
+        # Fallback: Supabase client (service role key bypasses RLS)
         try:
             client = get_supabase_client()
-            
-            # Query using Supabase client (service role key bypasses RLS)
-            response = client.table('snakes').select(
+
+            response = await client.table('snakes').select(
                 'snake_id, scientific_name, common_name, fang_type, description, danger_level, image_url'
             ).ilike('common_name', common_name).execute()
-            
+
             if response.data and len(response.data) > 0:
-                logger.info(f"Found snake by common name: {response.data[0].get('scientific_name')}")
+                logger.debug("Found snake by common name: %s", response.data[0].get('scientific_name'))
                 return response.data[0]
-            
-            logger.warning(f"No snake found with common name: {common_name}")
+
+            logger.warning("No snake found with common name: %s", common_name)
             return None
-                
+
         except Exception as e:
             logger.error(f"Error fetching snake by common name: {e}")
             raise
     
     @staticmethod
+    @_transient_retry
+    @_bounded
     async def get_facilities_with_antivenom(snake_id: int) -> List[Dict[str, Any]]:
         """
         Get facilities that have antivenom for a specific snake
@@ -103,133 +449,187 @@ class DatabaseManager:
         Returns:
             List of facilities with antivenom stock
         """
+        # Serve hot reads from Redis - stock changes rarely relative to reads
+        cache_key = FACILITIES_SNAKE_KEY.format(snake_id=snake_id)
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            logger.debug("Facilities cache hit for snake_id %s", snake_id)
+            return cached
+
+        # Primary path: single JOIN over the asyncpg pool; expiration and
+        # stock filtering happen in the WHERE clause
+        if db_pool is not None:
+            try:
+                async with acquire_connection() as connection:
+                    results = await connection.fetch(SQL_FACILITIES_BY_SNAKE, snake_id)
+                facilities = [dict(row) for row in results]
+                logger.debug("Found %d facilities with antivenom for snake_id %s", len(facilities), snake_id)
+                await cache_set(cache_key, facilities, FACILITIES_CACHE_TTL)
+                return facilities
+            except Exception as e:
+                logger.error(f"asyncpg facilities query failed, falling back to Supabase: {e}")
+
+        # Fallback: Supabase client (service role key bypasses RLS)
         try:
-            client = get_supabase_client()
-            
-            # First, get antivenom IDs that target this snake
-            antivenom_targets = client.table('antivenom_snake_targets').select(
-                'antivenom_id'
-            ).eq('snake_id', snake_id).execute()
-            
-            if not antivenom_targets.data:
-                logger.info(f"No antivenoms found for snake_id: {snake_id}")
-                return []
-            
-            antivenom_ids = [item['antivenom_id'] for item in antivenom_targets.data]
-            
-            # Get facilities with stock of these antivenoms
-            facilities_stock = client.table('facility_antivenom_stock').select(
-                '''
+            facilities = await DatabaseManager._supabase_facilities_for_snake(snake_id)
+            logger.debug("Found %d facilities with antivenom for snake_id %s", len(facilities), snake_id)
+            await cache_set(cache_key, facilities, FACILITIES_CACHE_TTL)
+            return facilities
+
+        except Exception as e:
+            logger.error(f"Error fetching facilities with antivenom: {e}")
+            raise
+
+    @staticmethod
+    async def _supabase_facilities_for_snake(snake_id: int) -> List[Dict[str, Any]]:
+        """
+        PostgREST facilities-with-stock lookup for one snake. Shared by the
+        get_facilities_with_antivenom fallback and the degraded two-step
+        path in find_facilities_by_common_name; deliberately undecorated so
+        callers already holding the concurrency semaphore can use it.
+        """
+        client = get_supabase_client()
+
+        # Single embedded query: PostgREST resolves the stock -> facility ->
+        # antivenom -> snake-target joins server-side, so one round trip
+        # replaces the previous targets/stock/facility/antivenom fan-out
+        facilities_stock = await client.table('facility_antivenom_stock').select(
+            '''
+            facility_id,
+            antivenom_id,
+            quantity,
+            expiration_date,
+            batch_no,
+            facilities!inner(
                 facility_id,
+                facility_name,
+                facility_type,
+                region,
+                province,
+                city_municipality,
+                address,
+                latitude,
+                longitude,
+                contact_number,
+                facility_email,
+                is_verified
+            ),
+            antivenoms!inner(
                 antivenom_id,
-                quantity,
-                expiration_date,
-                batch_no,
-                facilities(
-                    facility_id,
-                    facility_name,
-                    facility_type,
-                    region,
-                    province,
-                    city_municipality,
-                    address,
-                    latitude,
-                    longitude,
-                    contact_number,
-                    facility_email,
-                    is_verified
-                ),
-                antivenoms(
-                    antivenom_id,
-                    product_name,
-                    manufacturer
+                product_name,
+                manufacturer,
+                antivenom_snake_targets!inner(snake_id)
+            )
+            '''
+        ).eq(
+            'antivenoms.antivenom_snake_targets.snake_id', snake_id
+        ).gt('quantity', 0).or_(
+            # Expired stock never crosses the wire
+            f'expiration_date.is.null,expiration_date.gt.{date.today().isoformat()}'
+        ).execute()
+
+        # Assemble results in one comprehension; the !inner joins guarantee
+        # the embedded facility/antivenom dicts, so fields index directly
+        return [
+            {
+                'facility_id': f['facility_id'],
+                'facility_name': f['facility_name'],
+                'facility_type': f['facility_type'],
+                'region': f['region'],
+                'province': f['province'],
+                'city_municipality': f['city_municipality'],
+                'address': f.get('address'),
+                'latitude': f.get('latitude'),
+                'longitude': f.get('longitude'),
+                'contact_number': f.get('contact_number'),
+                'facility_email': f.get('facility_email'),
+                'antivenom_id': a['antivenom_id'],
+                'antivenom_name': a['product_name'],
+                'manufacturer': a.get('manufacturer'),
+                'quantity': s['quantity'],
+                'expiration_date': s.get('expiration_date'),
+                'batch_no': s.get('batch_no')
+            }
+            for s in facilities_stock.data
+            if (f := s.get('facilities')) and (a := s.get('antivenoms'))
+        ]
+
+    @staticmethod
+    @_transient_retry
+    @_bounded
+    async def find_facilities_by_common_name(common_name: str) -> List[Dict[str, Any]]:
+        """
+        Resolve a snake common name and fetch its stocked facilities in one
+        round trip, replacing the two-step name -> snake_id -> facilities flow.
+        Each row includes 'snake_id' so callers can still report which snake
+        matched.
+
+        Args:
+            common_name: Common name of the snake (e.g., "Common Mock Viper")
+
+        Returns:
+            List of facilities with antivenom stock (empty if the snake is
+            unknown or nothing is in stock)
+        """
+        # Primary path: single JOIN over the asyncpg pool
+        if db_pool is not None:
+            try:
+                async with acquire_connection() as connection:
+                    results = await connection.fetch(SQL_FACILITIES_BY_COMMON_NAME, common_name)
+                facilities = [dict(row) for row in results]
+                logger.debug(
+                    "Found %d facilities with antivenom for common name '%s'",
+                    len(facilities), common_name
                 )
-                '''
-            ).in_('antivenom_id', antivenom_ids).gt('quantity', 0).execute()
-            
-            # Process and format results
-            facilities = []
-            for stock in facilities_stock.data:
-                if stock.get('facilities'):
-                    facility = stock['facilities']
-                    antivenom = stock.get('antivenoms', {})
-                    
-                    # Check expiration date
-                    exp_date = stock.get('expiration_date')
-                    if exp_date:
-                        from datetime import datetime
-                        if datetime.fromisoformat(exp_date.replace('Z', '+00:00')).date() <= datetime.now().date():
-                            continue
-                    
-                    facilities.append({
-                        'facility_id': facility.get('facility_id'),
-                        'facility_name': facility.get('facility_name'),
-                        'facility_type': facility.get('facility_type'),
-                        'region': facility.get('region'),
-                        'province': facility.get('province'),
-                        'city_municipality': facility.get('city_municipality'),
-                        'address': facility.get('address'),
-                        'latitude': facility.get('latitude'),
-                        'longitude': facility.get('longitude'),
-                        'contact_number': facility.get('contact_number'),
-                        'facility_email': facility.get('facility_email'),
-                        'antivenom_id': antivenom.get('antivenom_id'),
-                        'antivenom_name': antivenom.get('product_name'),
-                        'manufacturer': antivenom.get('manufacturer'),
-                        'quantity': stock.get('quantity'),
-                        'expiration_date': stock.get('expiration_date'),
-                        'batch_no': stock.get('batch_no')
-                    })
-            
-            logger.info(f"Found {len(facilities)} facilities with antivenom for snake_id {snake_id}")
+                return facilities
+            except Exception as e:
+                logger.error(f"asyncpg combined lookup failed, falling back to Supabase: {e}")
+
+        # Fallback: the find_facilities_by_common_name function (migrations/003)
+        # keeps this a single PostgREST round trip too
+        try:
+            client = get_supabase_client()
+
+            try:
+                response = await client.rpc(
+                    'find_facilities_by_common_name', {'p_name': common_name}
+                ).execute()
+                facilities = response.data or []
+            except Exception as rpc_error:
+                # PGRST202: the migrations/003 function is not deployed on
+                # this database - degrade to the old two-step flow
+                # (name -> snake_id -> facilities) instead of failing
+                if getattr(rpc_error, 'code', None) != 'PGRST202':
+                    raise
+                logger.warning(
+                    "find_facilities_by_common_name function missing "
+                    "(migrations/003 not applied); using two-step lookup"
+                )
+                snake_response = await client.table('snakes').select(
+                    'snake_id'
+                ).ilike('common_name', common_name).limit(1).execute()
+                if not snake_response.data:
+                    logger.warning("No snake found with common name: %s", common_name)
+                    return []
+                snake_id = snake_response.data[0]['snake_id']
+                facilities = [
+                    {'snake_id': snake_id, **row}
+                    for row in await DatabaseManager._supabase_facilities_for_snake(snake_id)
+                ]
+
+            logger.debug(
+                "Found %d facilities with antivenom for common name '%s'",
+                len(facilities), common_name
+            )
             return facilities
-                
+
         except Exception as e:
-            logger.error(f"Error fetching facilities with antivenom: {e}")
-            # Try fallback with asyncpg if available
-            try:
-                if db_pool is not None:
-                    connection = await get_db_connection()
-                    try:
-                        query = """
-                            SELECT DISTINCT 
-                                f.facility_id,
-                                f.facility_name,
-                                f.facility_type,
-                                f.region,
-                                f.province,
-                                f.city_municipality,
-                                f.address,
-                                f.latitude,
-                                f.longitude,
-                                f.contact_number,
-                                f.facility_email,
-                                a.antivenom_id,
-                                a.product_name as antivenom_name,
-                                a.manufacturer,
-                                fas.quantity,
-                                fas.expiration_date,
-                                fas.batch_no
-                            FROM facilities f
-                            JOIN facility_antivenom_stock fas ON f.facility_id = fas.facility_id
-                            JOIN antivenoms a ON fas.antivenom_id = a.antivenom_id
-                            JOIN antivenom_snake_targets ast ON a.antivenom_id = ast.antivenom_id
-                            WHERE ast.snake_id = $1 
-                            -- AND f.is_verified = true
-                            AND fas.quantity > 0
-                            AND (fas.expiration_date IS NULL OR fas.expiration_date > CURRENT_DATE)
-                            ORDER BY f.facility_name
-                        """
-                        results = await connection.fetch(query, snake_id)
-                        return [dict(row) for row in results]
-                    finally:
-                        await release_db_connection(connection)
-            except Exception as fallback_error:
-                logger.error(f"Fallback query also failed: {fallback_error}")
-            
+            logger.error(f"Error in combined facilities lookup: {e}")
             raise
-    
+
     @staticmethod
+    @_transient_retry
+    @_bounded
     async def get_facilities_by_antivenom_type(antivenom_type: str) -> List[Dict[str, Any]]:
         """
         Get facilities that have antivenoms of a specific type (polyvalent or monovalent).
@@ -242,18 +642,34 @@ class DatabaseManager:
         Returns:
             List of facilities with the antivenom type and location data
         """
+        # Primary path: single JOIN over the asyncpg pool; the partial index
+        # on facility_antivenom_stock(antivenom_id, expiration_date) WHERE
+        # quantity > 0 (migrations/001) keeps expired/empty rows off the scan
+        if db_pool is not None:
+            try:
+                async with acquire_connection() as connection:
+                    results = await connection.fetch(SQL_FACILITIES_BY_ANTIVENOM_TYPE, antivenom_type)
+                facilities = [dict(row) for row in results]
+                logger.debug("Found %d facilities with '%s' antivenoms", len(facilities), antivenom_type)
+                return facilities
+            except Exception as e:
+                logger.error(f"asyncpg antivenom-type query failed, falling back to Supabase: {e}")
+
+        # Fallback: Supabase client (service role key bypasses RLS)
         try:
             client = get_supabase_client()
-            
-            # Build query with filters - join through antivenom_types table
-            query = client.table('facility_antivenom_stock').select(
+
+            # Single embedded query filtered on the antivenom type server-side;
+            # !inner joins drop rows without a matching facility/antivenom/type
+            # so no Python-side type filtering is needed
+            response = await client.table('facility_antivenom_stock').select(
                 '''
                 facility_id,
                 antivenom_id,
                 quantity,
                 expiration_date,
                 batch_no,
-                facilities(
+                facilities!inner(
                     facility_id,
                     facility_name,
                     facility_type,
@@ -266,65 +682,50 @@ class DatabaseManager:
                     contact_number,
                     facility_email
                 ),
-                antivenoms(
+                antivenoms!inner(
                     antivenom_id,
                     product_name,
                     manufacturer,
-                    antivenom_types(
+                    antivenom_types!inner(
                         type_name
                     )
                 )
                 '''
-            )
-            
-            # Only get facilities with stock
-            query = query.gt('quantity', 0)
-            
-            # Execute query
-            response = query.execute()
-            
-            # Process and filter results
-            facilities = []
-            for stock in response.data:
-                facility = stock.get('facilities')
-                if not facility:
-                    continue
-                
-                # Check if antivenom matches the requested type
-                antivenom = stock.get('antivenoms', {})
-                antivenom_type_data = antivenom.get('antivenom_types', {})
-                if antivenom_type_data.get('type_name') != antivenom_type:
-                    continue
-                
-                # Check expiration date
-                exp_date = stock.get('expiration_date')
-                if exp_date:
-                    from datetime import datetime
-                    if datetime.fromisoformat(exp_date.replace('Z', '+00:00')).date() <= datetime.now().date():
-                        continue
-                
-                facilities.append({
-                    'facility_id': facility.get('facility_id'),
-                    'facility_name': facility.get('facility_name'),
-                    'facility_type': facility.get('facility_type'),
-                    'region': facility.get('region'),
-                    'province': facility.get('province'),
-                    'city_municipality': facility.get('city_municipality'),
-                    'address': facility.get('address'),
-                    'latitude': facility.get('latitude'),
-                    'longitude': facility.get('longitude'),
-                    'contact_number': facility.get('contact_number'),
-                    'facility_email': facility.get('facility_email'),
-                    'antivenom_id': antivenom.get('antivenom_id'),
-                    'antivenom_name': antivenom.get('product_name'),
+            ).eq(
+                'antivenoms.antivenom_types.type_name', antivenom_type
+            ).gt('quantity', 0).or_(
+                # Expired stock never crosses the wire
+                f'expiration_date.is.null,expiration_date.gt.{date.today().isoformat()}'
+            ).execute()
+
+            # Assemble results in one comprehension; the !inner joins guarantee
+            # the embedded facility/antivenom dicts, so fields index directly
+            facilities = [
+                {
+                    'facility_id': f['facility_id'],
+                    'facility_name': f['facility_name'],
+                    'facility_type': f['facility_type'],
+                    'region': f['region'],
+                    'province': f['province'],
+                    'city_municipality': f['city_municipality'],
+                    'address': f.get('address'),
+                    'latitude': f.get('latitude'),
+                    'longitude': f.get('longitude'),
+                    'contact_number': f.get('contact_number'),
+                    'facility_email': f.get('facility_email'),
+                    'antivenom_id': a['antivenom_id'],
+                    'antivenom_name': a['product_name'],
                     'antivenom_type': antivenom_type,
-                    'manufacturer': antivenom.get('manufacturer'),
-                    'quantity': stock.get('quantity'),
-                    'expiration_date': stock.get('expiration_date'),
-                    'batch_no': stock.get('batch_no')
-                })
-            
-            logger.info(f"Found {len(facilities)} facilities with '{antivenom_type}' antivenoms")
+                    'manufacturer': a.get('manufacturer'),
+                    'quantity': s['quantity'],
+                    'expiration_date': s.get('expiration_date'),
+                    'batch_no': s.get('batch_no')
+                }
+                for s in response.data
+                if (f := s.get('facilities')) and (a := s.get('antivenoms'))
+            ]
+
+            logger.debug("Found %d facilities with '%s' antivenoms", len(facilities), antivenom_type)
             return facilities
                 
         except Exception as e:
@@ -332,6 +733,8 @@ class DatabaseManager:
             raise
     
     @staticmethod
+    @_transient_retry
+    @_bounded
     async def get_facilities_with_antivenom_by_name(antivenom_name: str) -> List[Dict[str, Any]]:
         """
         Get facilities that have a specific antivenom by name
@@ -343,134 +746,125 @@ class DatabaseManager:
             List of facilities with the antivenom
         """
         try:
-            connection = await get_db_connection()
-            try:
-                query = """
-                    SELECT DISTINCT 
-                        f.facility_id,
-                        f.facility_name,
-                        f.facility_type,
-                        f.region,
-                        f.province,
-                        f.city_municipality,
-                        f.address,
-                        f.latitude,
-                        f.longitude,
-                        f.contact_number,
-                        f.facility_email,
-                        a.antivenom_id,
-                        a.product_name as antivenom_name,
-                        a.manufacturer,
-                        fas.quantity,
-                        fas.expiration_date,
-                        fas.batch_no,
-                        ARRAY_AGG(DISTINCT s.scientific_name) as target_snakes
-                    FROM facilities f
-                    JOIN facility_antivenom_stock fas ON f.facility_id = fas.facility_id
-                    JOIN antivenoms a ON fas.antivenom_id = a.antivenom_id
-                    JOIN antivenom_snake_targets ast ON a.antivenom_id = ast.antivenom_id
-                    JOIN snakes s ON ast.snake_id = s.snake_id
-                    WHERE LOWER(a.product_name) ILIKE LOWER($1)
-                    -- AND f.is_verified = true
-                    AND fas.quantity > 0
-                    AND (fas.expiration_date IS NULL OR fas.expiration_date > CURRENT_DATE)
-                    GROUP BY f.facility_id, f.facility_name, f.facility_type, f.region, 
-                             f.province, f.city_municipality, f.address, f.latitude, 
-                             f.longitude, f.contact_number, f.facility_email, 
-                             a.antivenom_id, a.product_name, a.manufacturer, 
-                             fas.quantity, fas.expiration_date, fas.batch_no
-                    ORDER BY f.facility_name
-                """
-                results = await connection.fetch(query, f"%{antivenom_name}%")
-                
-                return [dict(row) for row in results]
-                
-            finally:
-                await release_db_connection(connection)
-                
+            async with acquire_connection() as connection:
+                results = await connection.fetch(SQL_FACILITIES_BY_ANTIVENOM_NAME, f"%{antivenom_name}%")
+
+            return [dict(row) for row in results]
+
         except Exception as e:
             logger.error(f"Error fetching facilities with antivenom by name: {e}")
             raise
     
     @staticmethod
-    async def get_all_snakes() -> List[Dict[str, Any]]:
+    async def get_all_snakes(fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
         """
         Get all snakes from the database
         Uses Supabase client with service role key to bypass RLS policies.
+
+        Args:
+            fields: Optional subset of snake columns to return (allow-listed);
+                    defaults to the narrow picker column set
         """
+        cols = _snake_select_columns(fields)
+        return await _result_cache.get_or_set(
+            ('all_snakes', cols),
+            SNAKE_LIST_CACHE_TTL,
+            lambda: DatabaseManager._fetch_all_snakes(cols)
+        )
+
+    @staticmethod
+    @_transient_retry
+    @_bounded
+    async def _fetch_all_snakes(cols: str) -> List[Dict[str, Any]]:
+        """Uncached fetch backing get_all_snakes"""
+        # Primary path: native SQL over the asyncpg pool
+        if db_pool is not None:
+            try:
+                async with acquire_connection() as connection:
+                    results = await connection.fetch(SQL_ALL_SNAKES.format(cols=cols))
+                logger.debug("Retrieved %d snakes from database", len(results))
+                return [dict(row) for row in results]
+            except Exception as e:
+                logger.error(f"asyncpg snakes query failed, falling back to Supabase: {e}")
+
+        # Fallback: Supabase client (service role key bypasses RLS)
         try:
             client = get_supabase_client()
-            
-            # Query using Supabase client (service role key bypasses RLS)
-            response = client.table('snakes').select(
-                'snake_id, scientific_name, common_name, fang_type, description, danger_level, image_url'
-            ).order('scientific_name').execute()
-            
-            logger.info(f"Retrieved {len(response.data)} snakes from database")
+
+            response = await client.table('snakes').select(cols).order('scientific_name').execute()
+
+            logger.debug("Retrieved %d snakes from database", len(response.data))
             return response.data
-                
+
         except Exception as e:
             logger.error(f"Error fetching all snakes: {e}")
-            # Try fallback with asyncpg if available
-            try:
-                if db_pool is not None:
-                    connection = await get_db_connection()
-                    try:
-                        query = """
-                            SELECT snake_id, scientific_name, common_name, fang_type, 
-                                   description, danger_level, image_url
-                            FROM snakes 
-                            ORDER BY scientific_name
-                        """
-                        results = await connection.fetch(query)
-                        return [dict(row) for row in results]
-                    finally:
-                        await release_db_connection(connection)
-            except Exception as fallback_error:
-                logger.error(f"Fallback query also failed: {fallback_error}")
-            
             raise
     
     @staticmethod
-    async def get_snakes_with_antivenom() -> List[Dict[str, Any]]:
+    async def get_snakes_with_antivenom(fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
         """
         Get only snakes that have at least one antivenom linked in antivenom_snake_targets table.
         This is used for the antivenom finder dropdown to only show snakes with available treatment.
         Uses Supabase client with service role key to bypass RLS policies.
-        
+
+        Args:
+            fields: Optional subset of snake columns to return (allow-listed);
+                    defaults to the narrow picker column set
+
         Returns:
             List of snake dictionaries that have antivenom available
         """
+        cols = _snake_select_columns(fields)
+        return await _result_cache.get_or_set(
+            ('snakes_with_antivenom', cols),
+            SNAKE_LIST_CACHE_TTL,
+            lambda: DatabaseManager._fetch_snakes_with_antivenom(cols)
+        )
+
+    @staticmethod
+    @_transient_retry
+    @_bounded
+    async def _fetch_snakes_with_antivenom(cols: str) -> List[Dict[str, Any]]:
+        """Uncached fetch backing get_snakes_with_antivenom"""
+        # Primary path: one query with the membership check done server-side
+        if db_pool is not None:
+            try:
+                async with acquire_connection() as connection:
+                    try:
+                        results = await connection.fetch(SQL_SNAKES_WITH_ANTIVENOM_MV.format(cols=cols))
+                    except asyncpg.UndefinedTableError:
+                        # Materialized view not created yet (migrations/002);
+                        # fall back to the base-table membership query
+                        results = await connection.fetch(SQL_SNAKES_WITH_ANTIVENOM.format(cols=cols))
+                logger.debug("Retrieved %d snakes with antivenom from database", len(results))
+                return [dict(row) for row in results]
+            except Exception as e:
+                logger.error(f"asyncpg snakes-with-antivenom query failed, falling back to Supabase: {e}")
+
+        # Fallback: Supabase client (service role key bypasses RLS)
         try:
             client = get_supabase_client()
-            
-            # Query snakes that exist in antivenom_snake_targets
-            # This means they have at least one antivenom product linked
-            response = client.table('snakes').select(
-                'snake_id, scientific_name, common_name, fang_type, description, danger_level, image_url'
-            ).in_(
-                'snake_id',
-                # Subquery to get snake_ids that have antivenoms
-                client.table('antivenom_snake_targets').select('snake_id').execute().data
+
+            # Single embedded query: the !inner join keeps only snakes that
+            # have at least one target row, deduplicated server-side, so no
+            # Python-side set() pass or second IN-list round trip is needed
+            snakes_response = await client.table('snakes').select(
+                f'{cols}, antivenom_snake_targets!inner(snake_id)'
             ).order('common_name').execute()
-            
-            # Alternative approach using join-like query
-            # Get all unique snake_ids from antivenom_snake_targets
-            targets_response = client.table('antivenom_snake_targets').select('snake_id').execute()
-            snake_ids_with_antivenom = list(set([t['snake_id'] for t in targets_response.data]))
-            
-            # Get snakes with those IDs
-            if snake_ids_with_antivenom:
-                snakes_response = client.table('snakes').select(
-                    'snake_id, scientific_name, common_name, fang_type, description, danger_level, image_url'
-                ).in_('snake_id', snake_ids_with_antivenom).order('common_name').execute()
-                
-                logger.info(f"Retrieved {len(snakes_response.data)} snakes with antivenom from database")
-                return snakes_response.data
-            else:
+
+            snakes = [
+                {k: v for k, v in row.items() if k != 'antivenom_snake_targets'}
+                for row in snakes_response.data
+            ]
+
+            if not snakes:
                 logger.warning("No snakes found with antivenom links")
                 return []
-                
+
+            logger.debug("Retrieved %d snakes with antivenom from database", len(snakes))
+            return snakes
+
+
         except Exception as e:
             logger.error(f"Error fetching snakes with antivenom: {e}")
             raise
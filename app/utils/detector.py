@@ -4,45 +4,195 @@ Handles snake detection with Oriented Bounding Box (OBB) and perspective transfo
 This implementation uses the working pipeline with proper OBB handling.
 """
 
+import itertools
 import logging
 import os
 import cv2
 import numpy as np
-import time
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 from ultralytics import YOLO
 import torch
+import torch.nn.functional as F
 
 from app.utils.config import settings
 
+# Numba is optional: with it, the per-OBB perspective matrices are solved
+# for the whole batch in one parallel kernel; without it the detector
+# falls back to per-box cv2.getPerspectiveTransform calls.
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _obb_matrices(src_pts: np.ndarray, widths: np.ndarray,
+                      heights: np.ndarray) -> np.ndarray:
+        """
+        Solve the 3x3 projective transform for every OBB at once.
+        Builds the standard 8x8 four-point-correspondence system (the same
+        math as cv2.getPerspectiveTransform) per box and solves them in a
+        prange loop, so N boxes cost one parallel kernel instead of N
+        Python -> C round trips.
+        """
+        n = src_pts.shape[0]
+        out = np.empty((n, 3, 3), dtype=np.float64)
+        for i in prange(n):
+            w = widths[i] - 1.0
+            h = heights[i] - 1.0
+            # Destination corners of the straightened rectangle
+            dst_x = np.array([0.0, w, w, 0.0])
+            dst_y = np.array([0.0, 0.0, h, h])
+            a = np.zeros((8, 8), dtype=np.float64)
+            b = np.empty(8, dtype=np.float64)
+            for j in range(4):
+                sx = src_pts[i, j, 0]
+                sy = src_pts[i, j, 1]
+                a[j, 0] = sx
+                a[j, 1] = sy
+                a[j, 2] = 1.0
+                a[j, 6] = -sx * dst_x[j]
+                a[j, 7] = -sy * dst_x[j]
+                a[j + 4, 3] = sx
+                a[j + 4, 4] = sy
+                a[j + 4, 5] = 1.0
+                a[j + 4, 6] = -sx * dst_y[j]
+                a[j + 4, 7] = -sy * dst_y[j]
+                b[j] = dst_x[j]
+                b[j + 4] = dst_y[j]
+            coeffs = np.linalg.solve(a, b)
+            out[i, 0, 0] = coeffs[0]
+            out[i, 0, 1] = coeffs[1]
+            out[i, 0, 2] = coeffs[2]
+            out[i, 1, 0] = coeffs[3]
+            out[i, 1, 1] = coeffs[4]
+            out[i, 1, 2] = coeffs[5]
+            out[i, 2, 0] = coeffs[6]
+            out[i, 2, 1] = coeffs[7]
+            out[i, 2, 2] = 1.0
+        return out
+
+
+@dataclass
+class DetectionBatch:
+    """
+    Columnar (structure-of-arrays) detection results for one image.
+    Keeping bboxes, OBB corners, and confidences as whole numpy arrays lets
+    callers filter/sort with vectorized comparisons (e.g. confidences > 0.5)
+    instead of re-iterating a list of dicts, and defers the per-detection
+    dict + .tolist() materialization to the JSON edge.
+    """
+    bboxes: np.ndarray         # (N, 4) int32 [x1, y1, x2, y2]
+    obbs: np.ndarray           # (N, 4, 2) float32 corner points
+    confidences: np.ndarray    # (N,) float32
+    crops: List[np.ndarray]
+    crop_paths: List[Optional[str]]
+
+    def __len__(self) -> int:
+        return len(self.confidences)
+
+    def to_dicts(self, include_obb_points: bool = False) -> List[Dict[str, Any]]:
+        """Materialize the legacy list-of-dicts API shape for response callers."""
+        detections = []
+        for i in range(len(self.confidences)):
+            crop = self.crops[i]
+            detections.append({
+                "bbox": self.bboxes[i].tolist(),
+                "obb_points": self.obbs[i].tolist() if include_obb_points else None,
+                "confidence": float(self.confidences[i]),
+                "class_id": 0,
+                "class_name": "snake",
+                "cropped_image": crop,
+                "cropped_image_path": self.crop_paths[i],
+                "crop_size": (crop.shape[1], crop.shape[0])
+            })
+        return detections
+
+
 class SnakeDetector:
     """Snake detection using YOLOv8-obb with perspective transformation"""
     
     def __init__(self):
         self.model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # GPU perspective warps need a CUDA build of OpenCV (the stock
+        # opencv-python wheel reports 0 devices and takes the CPU path)
+        try:
+            self._cuda_warp = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except Exception:
+            self._cuda_warp = False
+        if self._cuda_warp:
+            logger.info("OpenCV CUDA available - OBB crops will warp on GPU")
+        # Debug crop bookkeeping: the temp dir is created once here and the
+        # filenames come from a process-lifetime counter, so the hot loop
+        # makes no makedirs syscall and two crops written in the same
+        # millisecond can no longer collide (the old names were
+        # crop_<i>_<ms-timestamp>.jpg)
+        self._temp_dir = "temp"
+        self._crop_seq = itertools.count()
+        if settings.debug_save_crops:
+            os.makedirs(self._temp_dir, exist_ok=True)
+        # Reused letterbox canvas - allocated on first use, see _letterbox_640
+        self._letterbox_buf = None
+        # Debug crop paths registered per request, so a finishing request
+        # deletes only its own files instead of sweeping the whole temp dir
+        # out from under concurrent handlers
+        self._crops_by_request: Dict[str, List[str]] = {}
         self._load_model()
     
     def _load_model(self):
-        """Load the YOLOv8-obb detection model"""
+        """Load the YOLOv8-obb detection model, preferring a TensorRT engine"""
         try:
+            # A pre-exported TensorRT engine (FP16 tensor cores) runs the
+            # backbone 2-3x faster than eager FP32 PyTorch; Ultralytics loads
+            # and drives .engine files natively, so post-processing below is
+            # unchanged. Export once with export_detection_engine().
+            engine_path = settings.detection_engine_path
+            if self.device == "cuda" and os.path.exists(engine_path):
+                self.model = YOLO(engine_path, task="obb")
+                logger.info(f"Detection model loaded from TensorRT engine {engine_path}")
+                self._warmup()
+                return
+
             model_path = settings.detection_model_path
             if not os.path.exists(model_path):
                 logger.error(f"Detection model not found at {model_path}")
                 raise FileNotFoundError(f"Detection model not found at {model_path}")
-            
+
             self.model = YOLO(model_path)
             self.model.to(self.device)
             logger.info(f"Detection model loaded successfully from {model_path} on {self.device}")
-            
+            self._warmup()
+
         except Exception as e:
             logger.error(f"Failed to load detection model: {e}")
             raise
+
+    def _warmup(self, passes: int = 3):
+        """
+        Run dummy inferences so the first real request does not pay lazy
+        CUDA context creation, cuDNN autotune, and Ultralytics pipeline
+        setup. Full CUDA-graph capture is deliberately not attempted:
+        predict() interleaves host-side pre/post-processing that cannot be
+        captured, and the TensorRT engine path already fuses kernel
+        launches at build time.
+        """
+        try:
+            dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+            for _ in range(passes):
+                self.model.predict(source=dummy, imgsz=640, verbose=False)
+            logger.info(f"Detection model warmed up ({passes} passes)")
+        except Exception as e:
+            logger.warning(f"Detection model warmup failed (continuing): {e}")
     
-    def detect_snake(self, image_path: str, confidence_threshold: float = 0.5) -> Dict[str, Any]:
+    def detect_snake(self, image_path: str, confidence_threshold: float = 0.5,
+                     include_obb_points: bool = False,
+                     request_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Detect snake using OBB and create perspective-corrected crops.
         This matches the working pipeline with proper OBB handling.
@@ -50,98 +200,134 @@ class SnakeDetector:
         Args:
             image_path: Path to the input image
             confidence_threshold: Minimum confidence score for detection
-            
+            include_obb_points: Serialize the raw OBB corner points into the
+                response (only visualization callers need them)
+            request_id: When given, any debug crop files written for this
+                call are registered under it so finalize_request(request_id)
+                can delete exactly those files
+
         Returns:
             Dict containing detection results with OBB-cropped images
         """
+        # Read image with OpenCV; a missing path decodes to None, so no
+        # separate existence check (and its TOCTOU race) is needed
+        img = cv2.imread(image_path)
+        if img is None:
+            return {
+                "success": False,
+                "error": "Failed to read image",
+                "detections": []
+            }
+        return self.detect_snake_array(img, confidence_threshold,
+                                       include_obb_points, request_id)
+
+    def detect_snake_bytes(self, image_bytes: bytes, confidence_threshold: float = 0.5,
+                           include_obb_points: bool = False,
+                           request_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Detect snake on an in-memory encoded image (JPEG/PNG/WebP bytes).
+        Same semantics as detect_snake, minus the tempfile round trip -
+        upload handlers can pass the request body straight through without
+        writing it to disk first.
+        """
+        img = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return {
+                "success": False,
+                "error": "Failed to decode image",
+                "detections": []
+            }
+        return self.detect_snake_array(img, confidence_threshold,
+                                       include_obb_points, request_id)
+
+    def detect_snake_array(self, img: np.ndarray, confidence_threshold: float = 0.5,
+                           include_obb_points: bool = False,
+                           request_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Detect snake on an already-decoded BGR array.
+        Shared back half of detect_snake/detect_snake_bytes.
+        """
         try:
-            if not os.path.exists(image_path):
-                return {
-                    "success": False,
-                    "error": "Image file not found",
-                    "detections": []
-                }
-            
-            # Read image with OpenCV
-            img = cv2.imread(image_path)
-            if img is None:
+            # Letterbox with the specialized fixed-640 path; the model then
+            # sees an exactly-640 square, so Ultralytics' own per-call
+            # LetterBox degenerates to a no-op. Prediction runs on the
+            # already-decoded array so nothing re-reads the JPEG from disk.
+            canvas, scale, pad = self._letterbox_640(img)
+            results = self.model.predict(source=canvas, imgsz=640, verbose=False)[0]
+
+            result = self._build_detections(img, results, include_obb_points,
+                                            scale=scale, pad=pad)
+            if request_id is not None:
+                self.register_crops(request_id, result)
+            return result
+
+        except Exception as e:
+            logger.error(f"Detection error: {e}")
+            import traceback
+            traceback.print_exc()
+            return {
+                "success": False,
+                "error": str(e),
+                "detections": []
+            }
+
+    def _letterbox_640(self, img: np.ndarray) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        """
+        Letterbox an arbitrary-resolution frame into the fixed 640x640 model
+        input: aspect-preserving resize plus symmetric gray padding. The
+        model input size never changes, so the scale/pad arithmetic is
+        specialized here and the canvas is reused across calls (inference is
+        serialized through the micro-batcher, so it is never written
+        concurrently).
+
+        Returns:
+            (canvas, scale, (pad_x, pad_y)) - scale and pads map canvas
+            coordinates back onto the source image
+        """
+        size = 640
+        h, w = img.shape[:2]
+        r = min(size / h, size / w)
+        new_w, new_h = int(round(w * r)), int(round(h * r))
+        pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+        if self._letterbox_buf is None:
+            self._letterbox_buf = np.empty((size, size, 3), dtype=np.uint8)
+        canvas = self._letterbox_buf
+        canvas[:] = 114  # Ultralytics' letterbox gray
+        if (new_w, new_h) != (w, h):
+            resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        else:
+            resized = img
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+        return canvas, r, (pad_x, pad_y)
+
+    def _build_detections(self, img: np.ndarray, results,
+                          include_obb_points: bool = False,
+                          scale: Optional[float] = None,
+                          pad: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """
+        Post-process one image's OBB results into the detection dict.
+        Shared by detect_snake and the micro-batcher, which runs several
+        images through predict() in a single forward pass. Internally works
+        on a columnar DetectionBatch; the list-of-dicts shape is only
+        materialized here, at the response edge.
+        """
+        try:
+            batch = self._build_batch(img, results, scale=scale, pad=pad)
+            if batch is None or len(batch) == 0:
                 return {
                     "success": False,
-                    "error": "Failed to read image",
-                    "detections": []
+                    "detections": [],
+                    "message": "No snake detected"
                 }
-            
-            # Run YOLOv8-obb prediction
-            results = self.model.predict(image_path)[0]
-            
-            detections = []
-            
-            # Check if OBB (Oriented Bounding Box) results exist
-            if results.obb is not None and len(results.obb.xyxyxyxy) > 0:
-                logger.info(f"Found {len(results.obb.xyxyxyxy)} OBB detections")
-                
-                for i, obb_pts in enumerate(results.obb.xyxyxyxy.cpu().numpy()):
-                    # Get the 4 corner points of the oriented bounding box
-                    points = np.array(obb_pts, dtype=np.float32).reshape((4, 2))
-                    
-                    # Calculate width and height of the rotated box
-                    width = int(np.linalg.norm(points[0] - points[1]))
-                    height = int(np.linalg.norm(points[1] - points[2]))
-                    
-                    # Define destination points for perspective transform (straight rectangle)
-                    dst_pts = np.array([
-                        [0, 0],
-                        [width - 1, 0],
-                        [width - 1, height - 1],
-                        [0, height - 1]
-                    ], dtype=np.float32)
-                    
-                    # Get perspective transformation matrix
-                    M = cv2.getPerspectiveTransform(points, dst_pts)
-                    
-                    # Apply perspective warp to straighten the rotated detection
-                    warped = cv2.warpPerspective(img, M, (width, height))
-                    
-                    # Save the cropped/warped image
-                    timestamp = int(time.time() * 1000)
-                    crop_filename = f"crop_{i}_{timestamp}.jpg"
-                    crop_path = os.path.join("temp", crop_filename)
-                    
-                    # Ensure temp directory exists
-                    os.makedirs("temp", exist_ok=True)
-                    cv2.imwrite(crop_path, warped)
-                    
-                    # Get confidence score (but don't filter by it - pass all OBB detections)
-                    confidence = float(results.obb.conf[i].cpu().numpy())
-                    
-                    # Calculate regular bbox from OBB points for compatibility
-                    x_coords = points[:, 0]
-                    y_coords = points[:, 1]
-                    x1, y1 = int(x_coords.min()), int(y_coords.min())
-                    x2, y2 = int(x_coords.max()), int(y_coords.max())
-                    
-                    detection = {
-                        "bbox": [x1, y1, x2, y2],
-                        "obb_points": points.tolist(),  # Keep OBB points for visualization
-                        "confidence": confidence,
-                        "class_id": 0,
-                        "class_name": "snake",
-                        "cropped_image_path": crop_path,
-                        "crop_size": (width, height)
-                    }
-                    detections.append(detection)
-                    
-                    logger.info(f"Snake detected: confidence={confidence:.3f}, crop_size=({width}x{height})")
-            
-            success = len(detections) > 0
-            message = f"Found {len(detections)} snake(s)" if success else "No snake detected"
-            
+
+            detections = batch.to_dicts(include_obb_points)
             return {
-                "success": success,
+                "success": True,
                 "detections": detections,
-                "message": message
+                "message": f"Found {len(detections)} snake(s)"
             }
-            
+
         except Exception as e:
             logger.error(f"Detection error: {e}")
             import traceback
@@ -152,6 +338,221 @@ class SnakeDetector:
                 "detections": []
             }
 
+    def _build_batch(self, img: np.ndarray, results,
+                     scale: Optional[float] = None,
+                     pad: Optional[Tuple[int, int]] = None) -> Optional[DetectionBatch]:
+        """
+        Post-process one image's OBB results into a columnar DetectionBatch.
+        When scale/pad are given, the corners arrive in letterboxed-canvas
+        coordinates and are mapped back onto the source image first.
+        Returns None when the image has no detections.
+        """
+        # Early-out on empty results: tensor shape is host-side metadata,
+        # so this avoids the GPU->CPU sync the .cpu() pull would force
+        if results.obb is None or results.obb.xyxyxyxy.shape[0] == 0:
+            return None
+
+        # Pull the whole batch to host in two copies (corners, confs)
+        # instead of one small GPU->CPU sync per detection, then do
+        # the geometry as vectorized reductions over all boxes
+        # Ultralytics hands back float32 contiguous corners; cast with
+        # copy=False so this stays a view when the dtype already matches
+        pts = results.obb.xyxyxyxy.cpu().numpy().astype(np.float32, copy=False).reshape(-1, 4, 2)
+        confs = results.obb.conf.cpu().numpy()
+
+        if scale is not None and pad is not None:
+            # Undo the letterbox: strip the padding, rescale to source pixels,
+            # and clip anything that landed in the gray border
+            pts[:, :, 0] = np.clip((pts[:, :, 0] - pad[0]) / scale, 0, img.shape[1] - 1)
+            pts[:, :, 1] = np.clip((pts[:, :, 1] - pad[1]) / scale, 0, img.shape[0] - 1)
+
+        widths = np.linalg.norm(pts[:, 0] - pts[:, 1], axis=1).astype(np.int32)
+        heights = np.linalg.norm(pts[:, 1] - pts[:, 2], axis=1).astype(np.int32)
+        mins = pts.min(axis=1).astype(np.int32)
+        maxs = pts.max(axis=1).astype(np.int32)
+        bboxes = np.concatenate([mins, maxs], axis=1)
+
+        logger.info(f"Found {len(pts)} OBB detections")
+
+        # Upload the source image to VRAM once and warp every OBB
+        # there; per-pixel interpolation runs across CUDA threads
+        # instead of a single CPU core, and only the (much smaller)
+        # crops come back down
+        gpu_img = None
+        if self._cuda_warp:
+            try:
+                gpu_img = cv2.cuda_GpuMat()
+                gpu_img.upload(img)
+            except Exception as e:
+                logger.warning(f"CUDA upload failed, warping on CPU: {e}")
+                gpu_img = None
+
+        # Stock opencv-python has no CUDA, but a CUDA torch install (already
+        # required for the model) can still hold the image in VRAM and warp
+        # with grid_sample - same one-upload-many-warps shape as the GpuMat
+        # path, with only the small crops downloaded
+        img_t = None
+        if gpu_img is None and self.device == "cuda":
+            try:
+                img_t = torch.from_numpy(img).to("cuda").permute(2, 0, 1).unsqueeze(0).float()
+            except Exception as e:
+                logger.warning(f"CUDA tensor upload failed, warping on CPU: {e}")
+                img_t = None
+
+        # With more than one box the projective matrices batch into a single
+        # parallel Numba kernel; one box (the common case) keeps the plain
+        # OpenCV call, which beats kernel dispatch overhead at N=1
+        matrices = None
+        if NUMBA_AVAILABLE and len(pts) > 1:
+            try:
+                matrices = _obb_matrices(
+                    pts.astype(np.float64),
+                    widths.astype(np.float64),
+                    heights.astype(np.float64)
+                )
+            except Exception as e:
+                logger.warning(f"Batched OBB geometry failed, using per-box path: {e}")
+
+        crops = []
+        crop_paths = []
+        for i in range(len(pts)):
+            # Corner points of this oriented bounding box
+            # (4,2) float32 view into the batch array - no copy, no cast
+            points = pts[i]
+            width, height = int(widths[i]), int(heights[i])
+
+            if matrices is not None:
+                M = matrices[i]
+            else:
+                # Define destination points for perspective transform (straight rectangle)
+                dst_pts = np.array([
+                    [0, 0],
+                    [width - 1, 0],
+                    [width - 1, height - 1],
+                    [0, height - 1]
+                ], dtype=np.float32)
+                M = cv2.getPerspectiveTransform(points, dst_pts)
+
+            # Per-OBB warp stays in the loop: output sizes differ, so
+            # the warp itself cannot batch
+            if gpu_img is not None:
+                warped = cv2.cuda.warpPerspective(gpu_img, M, (width, height)).download()
+            elif img_t is not None:
+                warped = self._warp_crop_grid_sample(img_t, M, width, height)
+            else:
+                warped = cv2.warpPerspective(img, M, (width, height))
+
+            # Crops stay in memory; writing (encode + fsync) and the
+            # matching decode downstream are debug-only
+            crop_path = None
+            if settings.debug_save_crops:
+                crop_path = os.path.join(self._temp_dir, f"crop_{next(self._crop_seq)}.jpg")
+                cv2.imwrite(crop_path, warped)
+
+            crops.append(warped)
+            crop_paths.append(crop_path)
+
+            logger.info(f"Snake detected: confidence={float(confs[i]):.3f}, crop_size=({width}x{height})")
+
+        return DetectionBatch(
+            bboxes=bboxes,
+            obbs=pts.astype(np.float32, copy=False),
+            confidences=confs.astype(np.float32, copy=False),
+            crops=crops,
+            crop_paths=crop_paths
+        )
+
+    def _warp_crop_grid_sample(self, img_t: torch.Tensor, M: np.ndarray,
+                               width: int, height: int) -> np.ndarray:
+        """
+        Perspective-warp one OBB crop on the GPU via F.grid_sample.
+        The source image is already resident in VRAM as img_t (1,3,H,W);
+        each output pixel maps back through the inverse of the src->dst
+        homography, normalized into grid_sample's [-1, 1] convention
+        (align_corners=False treats pixel centers as half-integer, hence
+        the +0.5). Coordinates stay float32 - half precision loses pixel
+        accuracy on large source images.
+        """
+        src_h, src_w = img_t.shape[2], img_t.shape[3]
+        m_inv = torch.linalg.inv(
+            torch.as_tensor(M, dtype=torch.float32, device=img_t.device)
+        )
+        ys, xs = torch.meshgrid(
+            torch.arange(height, dtype=torch.float32, device=img_t.device),
+            torch.arange(width, dtype=torch.float32, device=img_t.device),
+            indexing="ij"
+        )
+        coords = torch.stack((xs, ys, torch.ones_like(xs)), dim=-1).reshape(-1, 3)
+        src = coords @ m_inv.T
+        src = src[:, :2] / src[:, 2:3]
+        gx = (src[:, 0] + 0.5) / src_w * 2.0 - 1.0
+        gy = (src[:, 1] + 0.5) / src_h * 2.0 - 1.0
+        grid = torch.stack((gx, gy), dim=-1).reshape(1, height, width, 2)
+        warped = F.grid_sample(img_t, grid, mode="bilinear", align_corners=False)
+        return (
+            warped.squeeze(0).permute(1, 2, 0)
+            .round_().clamp_(0, 255).to(torch.uint8)
+            .cpu().numpy()
+        )
+
+    def register_crops(self, request_id: str, result: Dict[str, Any]):
+        """Record the debug crop files a detection result produced so they
+        can later be deleted with finalize_request"""
+        paths = [
+            d["cropped_image_path"]
+            for d in result.get("detections", [])
+            if d.get("cropped_image_path")
+        ]
+        if paths:
+            self._crops_by_request.setdefault(request_id, []).extend(paths)
+
+    def finalize_request(self, request_id: str):
+        """
+        Delete the debug crops registered for one request. Deletion is O(k)
+        in the request's own crops and cannot race other in-flight handlers,
+        unlike the directory-wide cleanup_temp_files sweep (which remains as
+        a periodic orphan collector).
+        """
+        for path in self._crops_by_request.pop(request_id, []):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def export_detection_engine(half: bool = True) -> str:
+    """
+    One-time export of the detection model to a TensorRT engine.
+    Run on the deployment GPU (engines are device-specific); the detector
+    picks the engine up automatically on the next start.
+
+    Args:
+        half: Build the engine with FP16 precision (tensor cores)
+
+    Returns:
+        Path to the exported engine file
+    """
+    model_path = settings.detection_model_path
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Detection model not found at {model_path}")
+
+    model = YOLO(model_path)
+    exported = model.export(format="engine", half=half, imgsz=640)
+    logger.info(f"Detection model exported to TensorRT engine: {exported}")
+    return exported
+
+
+def _warm_obb_kernel():
+    """Trigger Numba compilation of the OBB geometry kernel at startup so
+    the first multi-detection request does not pay the JIT cost"""
+    if not NUMBA_AVAILABLE:
+        return
+    try:
+        box = [[0.0, 0.0], [9.0, 0.0], [9.0, 9.0], [0.0, 9.0]]
+        _obb_matrices(np.array([box, box]), np.full(2, 10.0), np.full(2, 10.0))
+    except Exception as e:
+        logger.warning(f"OBB geometry kernel warmup failed: {e}")
+
 
 # Global detector instance
 _detector = None
@@ -161,19 +562,38 @@ def get_detector() -> SnakeDetector:
     global _detector
     if _detector is None:
         _detector = SnakeDetector()
+        _warm_obb_kernel()
     return _detector
 
 
-def cleanup_temp_files():
-    """Clean up temporary cropped images"""
+def cleanup_temp_files(file_list: Optional[List[str]] = None):
+    """
+    Clean up temporary cropped images.
+
+    Args:
+        file_list: Optional explicit paths to delete. When omitted, sweeps
+            every crop file in the temp dir - orphan collection only, since
+            it also hits files that concurrent requests are still reading;
+            request handlers should use SnakeDetector.finalize_request.
+    """
+    if file_list is not None:
+        for path in file_list:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        return
     try:
-        temp_dir = "temp"
-        if os.path.exists(temp_dir):
-            for file in os.listdir(temp_dir):
-                if file.startswith("crop_") and file.endswith(".jpg"):
+        # scandir iterates DirEntry objects lazily (no full-listing
+        # materialization, and the entry already carries the joined path)
+        with os.scandir("temp") as entries:
+            for entry in entries:
+                if entry.name.startswith("crop_") and entry.name.endswith(".jpg"):
                     try:
-                        os.remove(os.path.join(temp_dir, file))
-                    except:
+                        os.unlink(entry.path)
+                    except OSError:
                         pass
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.warning(f"Failed to cleanup temp files: {e}")
\ No newline at end of file
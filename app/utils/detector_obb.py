@@ -54,14 +54,8 @@ class SnakeDetectorOBB:
             Dict containing detection results with OBB-cropped images
         """
         try:
-            if not os.path.exists(image_path):
-                return {
-                    "success": False,
-                    "error": "Image file not found",
-                    "detections": []
-                }
-            
-            # Read image with OpenCV
+            # Read image with OpenCV; a missing path decodes to None, so no
+            # separate existence check (and its TOCTOU race) is needed
             img = cv2.imread(image_path)
             if img is None:
                 return {
@@ -70,23 +64,34 @@ class SnakeDetectorOBB:
                     "detections": []
                 }
             
-            # Run YOLOv8-obb prediction
-            results = self.model.predict(image_path)[0]
+            # Run YOLOv8-obb prediction on the already-decoded array so
+            # Ultralytics does not re-read and re-decode the JPEG from disk
+            results = self.model.predict(source=img, verbose=False)[0]
             
             detections = []
             
             # Check if OBB (Oriented Bounding Box) results exist
             if results.obb is not None and len(results.obb.xyxyxyxy) > 0:
-                logger.info(f"Found {len(results.obb.xyxyxyxy)} OBB detections")
-                
-                for i, obb_pts in enumerate(results.obb.xyxyxyxy.cpu().numpy()):
-                    # Get the 4 corner points of the oriented bounding box
-                    points = np.array(obb_pts, dtype=np.float32).reshape((4, 2))
-                    
-                    # Calculate width and height of the rotated box
-                    width = int(np.linalg.norm(points[0] - points[1]))
-                    height = int(np.linalg.norm(points[1] - points[2]))
-                    
+                # Pull the whole batch to host in two copies (corners, confs)
+                # instead of one small GPU->CPU sync per detection, then do
+                # the geometry as vectorized reductions over all boxes
+                # Float32 contiguous from Ultralytics; copy=False keeps a view
+                pts = results.obb.xyxyxyxy.cpu().numpy().astype(np.float32, copy=False).reshape(-1, 4, 2)
+                confs = results.obb.conf.cpu().numpy()
+
+                widths = np.linalg.norm(pts[:, 0] - pts[:, 1], axis=1).astype(np.int32)
+                heights = np.linalg.norm(pts[:, 1] - pts[:, 2], axis=1).astype(np.int32)
+                mins = pts.min(axis=1).astype(np.int32)
+                maxs = pts.max(axis=1).astype(np.int32)
+
+                logger.info(f"Found {len(pts)} OBB detections")
+
+                for i in range(len(pts)):
+                    # Corner points of this oriented bounding box
+                    # (4,2) float32 view into the batch array - no copy, no cast
+                    points = pts[i]
+                    width, height = int(widths[i]), int(heights[i])
+
                     # Define destination points for perspective transform (straight rectangle)
                     dst_pts = np.array([
                         [0, 0],
@@ -94,30 +99,28 @@ class SnakeDetectorOBB:
                         [width - 1, height - 1],
                         [0, height - 1]
                     ], dtype=np.float32)
-                    
-                    # Get perspective transformation matrix
+
+                    # Per-OBB warp stays in the loop: output sizes differ, so
+                    # the transform + warp cannot batch
                     M = cv2.getPerspectiveTransform(points, dst_pts)
-                    
-                    # Apply perspective warp to straighten the rotated detection
                     warped = cv2.warpPerspective(img, M, (width, height))
-                    
-                    # Save the cropped/warped image
-                    timestamp = int(time.time() * 1000)
-                    crop_filename = f"crop_{i}_{timestamp}.jpg"
-                    crop_path = os.path.join("temp", crop_filename)
-                    
-                    # Ensure temp directory exists
-                    os.makedirs("temp", exist_ok=True)
-                    cv2.imwrite(crop_path, warped)
-                    
-                    # Get confidence score (but don't filter by it - pass all OBB detections)
-                    confidence = float(results.obb.conf[i].cpu().numpy())
-                    
-                    # Calculate regular bbox from OBB points for compatibility
-                    x_coords = points[:, 0]
-                    y_coords = points[:, 1]
-                    x1, y1 = int(x_coords.min()), int(y_coords.min())
-                    x2, y2 = int(x_coords.max()), int(y_coords.max())
+
+                    # Crops stay in memory; writing (encode + fsync) and the
+                    # matching decode downstream are debug-only
+                    crop_path = None
+                    if settings.debug_save_crops:
+                        timestamp = int(time.time() * 1000)
+                        crop_filename = f"crop_{i}_{timestamp}.jpg"
+                        crop_path = os.path.join("temp", crop_filename)
+                        os.makedirs("temp", exist_ok=True)
+                        cv2.imwrite(crop_path, warped)
+
+                    # Confidence (not filtered on - pass all OBB detections)
+                    confidence = float(confs[i])
+
+                    # Regular bbox from the precomputed per-box min/max
+                    x1, y1 = int(mins[i, 0]), int(mins[i, 1])
+                    x2, y2 = int(maxs[i, 0]), int(maxs[i, 1])
                     
                     detection = {
                         "bbox": [x1, y1, x2, y2],
@@ -125,6 +128,7 @@ class SnakeDetectorOBB:
                         "confidence": confidence,
                         "class_id": 0,
                         "class_name": "snake",
+                        "cropped_image": warped,
                         "cropped_image_path": crop_path,
                         "crop_size": (width, height)
                     }
@@ -166,13 +170,16 @@ def get_detector_obb() -> SnakeDetectorOBB:
 def cleanup_temp_files():
     """Clean up temporary cropped images"""
     try:
-        temp_dir = "temp"
-        if os.path.exists(temp_dir):
-            for file in os.listdir(temp_dir):
-                if file.startswith("crop_") and file.endswith(".jpg"):
+        # scandir iterates DirEntry objects lazily (no full-listing
+        # materialization, and the entry already carries the joined path)
+        with os.scandir("temp") as entries:
+            for entry in entries:
+                if entry.name.startswith("crop_") and entry.name.endswith(".jpg"):
                     try:
-                        os.remove(os.path.join(temp_dir, file))
-                    except:
+                        os.unlink(entry.path)
+                    except OSError:
                         pass
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.warning(f"Failed to cleanup temp files: {e}")
\ No newline at end of file
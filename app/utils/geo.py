@@ -0,0 +1,100 @@
+"""
+Haversine distance kernels.
+Compiled with Numba when it is installed - native scalar math plus a
+parallel array variant - with pure math/NumPy fallbacks of identical
+signature otherwise, so callers never need to know which is active.
+"""
+
+# Bound names skip the math-module attribute lookup on every call;
+# the scalar kernel sits on the routing fallback hot path
+from math import asin, cos, radians, sin, sqrt
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    lat1r = radians(lat1)
+    lon1r = radians(lon1)
+    lat2r = radians(lat2)
+    lon2r = radians(lon2)
+
+    dlat = lat2r - lat1r
+    dlon = lon2r - lon1r
+    a = sin(dlat * 0.5) ** 2 + cos(lat1r) * cos(lat2r) * sin(dlon * 0.5) ** 2
+    return EARTH_RADIUS_KM * 2.0 * asin(sqrt(a))
+
+
+def _haversine_km_array_numpy(lat1: float, lon1: float,
+                              lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Vectorized one-to-many great-circle distances in kilometers.
+    Computed in float32: half the memory bandwidth and twice the SIMD
+    lanes of float64, with a ~1e-3 km accuracy floor - far below any
+    routing-decision threshold. The scalar haversine_km stays float64.
+    """
+    lat1r = np.float32(radians(lat1))
+    lon1r = np.float32(radians(lon1))
+    lat2r = np.radians(np.asarray(lats, dtype=np.float32))
+    lon2r = np.radians(np.asarray(lons, dtype=np.float32))
+
+    dlat = lat2r - lat1r
+    dlon = lon2r - lon1r
+    a = np.sin(dlat * np.float32(0.5)) ** 2 + np.cos(lat1r) * np.cos(lat2r) * np.sin(dlon * np.float32(0.5)) ** 2
+    return np.float32(EARTH_RADIUS_KM * 2.0) * np.arcsin(np.sqrt(a))
+
+
+if NUMBA_AVAILABLE:
+    # cache=True persists the compiled kernels across process starts;
+    # fastmath lets LLVM vectorize the transcendentals
+    haversine_km = njit(cache=True, fastmath=True)(_haversine_km)
+
+    @njit(parallel=True, cache=True, fastmath=True)
+    def haversine_km_array(lat1: float, lon1: float,
+                           lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        # float32 output for the same bandwidth/accuracy trade as the
+        # NumPy fallback; feed float32 inputs to keep the loads narrow too
+        n = lats.shape[0]
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            out[i] = haversine_km(lat1, lon1, lats[i], lons[i])
+        return out
+else:
+    haversine_km = _haversine_km
+    haversine_km_array = _haversine_km_array_numpy
+
+
+class HaversineFrom:
+    """
+    Haversine specialized to a fixed source point.
+    Caches the radian conversion and cos(lat) of the source at construction
+    so repeated .to() calls against the same origin (one user location,
+    many facilities) skip roughly 40% of the per-call transcendental work.
+    For large destination sets prefer haversine_km_array; this covers
+    scalar call sites that measure one pair at a time.
+    """
+
+    __slots__ = ("lat1_r", "lon1_r", "cos_lat1")
+
+    def __init__(self, lat: float, lon: float):
+        self.lat1_r = radians(lat)
+        self.lon1_r = radians(lon)
+        self.cos_lat1 = cos(self.lat1_r)
+
+    def to(self, lat2: float, lon2: float) -> float:
+        """Great-circle distance from the cached source to (lat2, lon2) in km"""
+        lat2_r = radians(lat2)
+        a = (
+            sin((lat2_r - self.lat1_r) * 0.5) ** 2
+            + self.cos_lat1 * cos(lat2_r)
+            * sin((radians(lon2) - self.lon1_r) * 0.5) ** 2
+        )
+        return EARTH_RADIUS_KM * 2.0 * asin(sqrt(a))
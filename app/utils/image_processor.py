@@ -5,7 +5,9 @@ Handles image validation, preprocessing, and format conversion.
 
 import logging
 import os
+import struct
 import tempfile
+import threading
 from typing import Tuple, Optional, Dict, Any
 from PIL import Image, ImageOps
 import cv2
@@ -27,7 +29,64 @@ class ImageProcessor:
     
     # Maximum file size (10MB)
     MAX_FILE_SIZE = 10 * 1024 * 1024
+
+    # Shared CLAHE instance: createCLAHE rebuilds its lookup tables on every
+    # call, so construct once. apply() is not thread-safe, hence the lock
+    # (enhancement runs from threadpool workers).
+    _CLAHE = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    _CLAHE_LOCK = threading.Lock()
     
+    @staticmethod
+    def _sniff_dimensions(image_data: bytes) -> Optional[Tuple[int, int, str]]:
+        """
+        Read width/height/format straight from the file header (JPEG SOF,
+        PNG IHDR, WebP VP8/VP8L/VP8X) without decoding any pixels.
+        Returns None when the bytes are not one of those formats.
+        """
+        header = image_data[:32]
+
+        # PNG: fixed signature, IHDR width/height at bytes 16-24
+        if header.startswith(b'\x89PNG\r\n\x1a\n') and len(image_data) >= 24:
+            width, height = struct.unpack('>II', image_data[16:24])
+            return width, height, 'PNG'
+
+        # JPEG: walk the segment markers to the first SOF frame header
+        if header.startswith(b'\xff\xd8'):
+            offset = 2
+            while offset + 9 < len(image_data):
+                if image_data[offset] != 0xFF:
+                    break
+                marker = image_data[offset + 1]
+                # Standalone markers carry no length field
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                    offset += 2
+                    continue
+                length = struct.unpack('>H', image_data[offset + 2:offset + 4])[0]
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>HH', image_data[offset + 5:offset + 9])
+                    return width, height, 'JPEG'
+                offset += 2 + length
+            return None
+
+        # WebP: RIFF container, dimensions depend on the first chunk type
+        if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+            chunk = header[12:16]
+            if chunk == b'VP8X' and len(image_data) >= 30:
+                width = int.from_bytes(image_data[24:27], 'little') + 1
+                height = int.from_bytes(image_data[27:30], 'little') + 1
+                return width, height, 'WEBP'
+            if chunk == b'VP8 ' and len(image_data) >= 30:
+                width = struct.unpack('<H', image_data[26:28])[0] & 0x3FFF
+                height = struct.unpack('<H', image_data[28:30])[0] & 0x3FFF
+                return width, height, 'WEBP'
+            if chunk == b'VP8L' and len(image_data) >= 25:
+                bits = int.from_bytes(image_data[21:25], 'little')
+                width = (bits & 0x3FFF) + 1
+                height = ((bits >> 14) & 0x3FFF) + 1
+                return width, height, 'WEBP'
+
+        return None
+
     @staticmethod
     def validate_image(image_data: bytes, filename: str) -> Dict[str, Any]:
         """
@@ -61,28 +120,31 @@ class ImageProcessor:
                 result['error'] = f"Unsupported format: {file_ext} (supported: {ImageProcessor.SUPPORTED_FORMATS})"
                 return result
             
-            # Try to open with PIL
-            image = Image.open(BytesIO(image_data))
-            
-            # Verify it's a valid image
-            image.verify()
-            
-            # Re-open for processing (verify() closes the image)
-            image = Image.open(BytesIO(image_data))
-            
-            result['format'] = image.format
-            result['size'] = len(image_data)
-            result['dimensions'] = image.size
-            
+            # Read dimensions from the header bytes where possible - O(bytes
+            # scanned) instead of the old verify() + reopen double decode
+            sniffed = ImageProcessor._sniff_dimensions(image_data)
+            if sniffed is not None:
+                width, height, image_format = sniffed
+                result['format'] = image_format
+                result['size'] = len(image_data)
+                result['dimensions'] = (width, height)
+            else:
+                # Fallback for the rarer formats (BMP/TIFF): PIL parses the
+                # header lazily; pixel data only decodes on .load()
+                image = Image.open(BytesIO(image_data))
+                result['format'] = image.format
+                result['size'] = len(image_data)
+                result['dimensions'] = image.size
+                width, height = image.size
+
+                # Check if image is grayscale
+                if image.mode in ('L', 'LA'):
+                    result['warnings'].append("Grayscale image detected, converting to RGB")
+
             # Check dimensions
-            width, height = image.size
             if width > ImageProcessor.MAX_WIDTH or height > ImageProcessor.MAX_HEIGHT:
                 result['warnings'].append(f"Large image ({width}x{height}), will be resized")
-            
-            # Check if image is grayscale
-            if image.mode in ('L', 'LA'):
-                result['warnings'].append("Grayscale image detected, converting to RGB")
-            
+
             result['valid'] = True
             
         except Exception as e:
@@ -90,42 +152,134 @@ class ImageProcessor:
         
         return result
     
+    @staticmethod
+    def _read_exif_orientation(image_data: bytes) -> int:
+        """Read the EXIF orientation tag without decoding any pixel data
+        (PIL parses headers lazily; tag 274 = Orientation)"""
+        try:
+            exif = Image.open(BytesIO(image_data)).getexif()
+            return int(exif.get(274, 1)) if exif else 1
+        except Exception:
+            return 1
+
+    @staticmethod
+    def _apply_exif_orientation(img: np.ndarray, orientation: int) -> np.ndarray:
+        """Apply an EXIF orientation with cv2 rotate/flip/transpose"""
+        if orientation == 2:
+            return cv2.flip(img, 1)
+        if orientation == 3:
+            return cv2.rotate(img, cv2.ROTATE_180)
+        if orientation == 4:
+            return cv2.flip(img, 0)
+        if orientation == 5:
+            return cv2.transpose(img)
+        if orientation == 6:
+            return cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+        if orientation == 7:
+            return cv2.flip(cv2.transpose(img), -1)
+        if orientation == 8:
+            return cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+        return img
+
+    @staticmethod
+    def _resize_bounded(img: np.ndarray, target_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Resize to target_size, or bound within MAX_WIDTH/MAX_HEIGHT
+        preserving aspect ratio. INTER_AREA for downscale (best quality and
+        vectorized), INTER_LINEAR for upscale."""
+        height, width = img.shape[:2]
+        if target_size:
+            shrinking = target_size[0] < width or target_size[1] < height
+            return cv2.resize(
+                img, target_size,
+                interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+            )
+        if width > ImageProcessor.MAX_WIDTH or height > ImageProcessor.MAX_HEIGHT:
+            scale = min(ImageProcessor.MAX_WIDTH / width, ImageProcessor.MAX_HEIGHT / height)
+            return cv2.resize(
+                img, (int(width * scale), int(height * scale)),
+                interpolation=cv2.INTER_AREA
+            )
+        return img
+
+    @staticmethod
+    def load_and_validate(image_data: bytes, filename: str,
+                          target_size: Optional[Tuple[int, int]] = None
+                          ) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Validate and decode an upload in one pass.
+        Validation stays header-only (see validate_image); for oversize
+        JPEGs the decode goes through PIL's draft() so libjpeg downscales
+        at 1/2, 1/4, or 1/8 scale during the DCT and the full-resolution
+        decode never happens.
+
+        Args:
+            image_data: Raw image data bytes
+            filename: Original filename
+            target_size: Optional target size (width, height)
+
+        Returns:
+            Tuple of (RGB image array or None when invalid, validation dict)
+        """
+        validation = ImageProcessor.validate_image(image_data, filename)
+        if not validation['valid']:
+            return None, validation
+
+        dims = validation.get('dimensions')
+        if (validation.get('format') == 'JPEG' and dims
+                and (dims[0] > ImageProcessor.MAX_WIDTH or dims[1] > ImageProcessor.MAX_HEIGHT)):
+            try:
+                image = Image.open(BytesIO(image_data))
+                image.draft('RGB', (ImageProcessor.MAX_WIDTH, ImageProcessor.MAX_HEIGHT))
+                img = np.asarray(image.convert('RGB'))
+
+                orientation = ImageProcessor._read_exif_orientation(image_data)
+                if orientation != 1:
+                    img = ImageProcessor._apply_exif_orientation(img, orientation)
+
+                return ImageProcessor._resize_bounded(img, target_size), validation
+            except Exception as e:
+                logger.warning(f"JPEG draft decode failed, using full decode: {e}")
+
+        return ImageProcessor.preprocess_image(image_data, target_size), validation
+
     @staticmethod
     def preprocess_image(image_data: bytes, target_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
         """
         Preprocess image for AI model inference.
-        
+        Decodes and resizes with OpenCV (SIMD-accelerated) rather than PIL:
+        one decode straight to a numpy array, no PIL Image round trip.
+
         Args:
             image_data: Raw image data bytes
             target_size: Optional target size (width, height)
-            
+
         Returns:
-            Preprocessed image as numpy array
+            Preprocessed image as numpy array (RGB)
         """
         try:
-            # Load image with PIL
-            image = Image.open(BytesIO(image_data))
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Auto-orient image based on EXIF data
-            image = ImageOps.exif_transpose(image)
-            
-            # Resize if needed
-            if target_size:
-                image = image.resize(target_size, Image.Resampling.LANCZOS)
-            elif image.size[0] > ImageProcessor.MAX_WIDTH or image.size[1] > ImageProcessor.MAX_HEIGHT:
-                # Maintain aspect ratio while resizing
-                image.thumbnail((ImageProcessor.MAX_WIDTH, ImageProcessor.MAX_HEIGHT), Image.Resampling.LANCZOS)
-            
-            # Convert to numpy array
-            image_array = np.array(image)
-            
+            # IMREAD_COLOR always yields 3-channel output, which also covers
+            # the grayscale -> RGB conversion PIL did explicitly
+            img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError("Failed to decode image data")
+
+            # Auto-orient from the EXIF tag. Only JPEG and TIFF uploads carry
+            # camera orientation in practice, so other magic bytes (PNG, WebP,
+            # BMP) skip the PIL header parse entirely, and orientation 1
+            # (already upright - the overwhelming majority) skips the rotate.
+            orientation = 1
+            if image_data[:2] == b'\xff\xd8' or image_data[:4] in (b'II*\x00', b'MM\x00*'):
+                orientation = ImageProcessor._read_exif_orientation(image_data)
+            if orientation != 1:
+                img = ImageProcessor._apply_exif_orientation(img, orientation)
+
+            img = ImageProcessor._resize_bounded(img, target_size)
+
+            image_array = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
             logger.info(f"Image preprocessed: shape={image_array.shape}")
             return image_array
-            
+
         except Exception as e:
             logger.error(f"Image preprocessing failed: {e}")
             raise
@@ -201,24 +355,21 @@ class ImageProcessor:
             Enhanced image
         """
         try:
-            # Convert to BGR for OpenCV
-            if len(image_array.shape) == 3:
-                image_bgr = cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR)
-            else:
-                image_bgr = image_array
-            
-            # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
-            lab = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2LAB)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-            lab[:, :, 0] = clahe.apply(lab[:, :, 0])
-            enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-            
-            # Convert back to RGB
-            if len(image_array.shape) == 3:
-                enhanced = cv2.cvtColor(enhanced, cv2.COLOR_BGR2RGB)
-            
+            # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization).
+            # cv2 converts RGB<->LAB directly, so the old RGB->BGR->LAB->BGR->RGB
+            # chain is two redundant full-image passes; two conversions give an
+            # identical result. UMat routes the conversions and CLAHE through
+            # OpenCL when a device is available and falls back to CPU
+            # transparently; only the final .get() copies back.
+            img_u = cv2.UMat(image_array)
+            lab = cv2.cvtColor(img_u, cv2.COLOR_RGB2LAB)
+            l_chan, a_chan, b_chan = cv2.split(lab)
+            with ImageProcessor._CLAHE_LOCK:
+                l_chan = ImageProcessor._CLAHE.apply(l_chan)
+            enhanced = cv2.cvtColor(cv2.merge([l_chan, a_chan, b_chan]), cv2.COLOR_LAB2RGB)
+
             logger.debug("Image enhancement applied")
-            return enhanced
+            return enhanced.get()
             
         except Exception as e:
             logger.warning(f"Image enhancement failed, using original: {e}")
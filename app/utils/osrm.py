@@ -3,41 +3,225 @@ OSRM (Open Source Routing Machine) integration for distance and route calculatio
 Handles routing queries for facility distance calculations.
 """
 
+import functools
 import logging
 import asyncio
+import time
 from typing import Dict, Any, List, Optional, Tuple
 import httpx
+import numpy as np
+import orjson
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from app.utils.cache import TTLCache
 from app.utils.config import settings
+from app.utils.geo import haversine_km, haversine_km_array
 
 logger = logging.getLogger(__name__)
 
+# Route results memoized on coordinates rounded to 5 decimal places (~1 m
+# resolution - driving distance does not change below that). Facility
+# coordinates repeat constantly across finder requests, so a warm entry
+# answers in a dict lookup instead of an OSRM round trip.
+_route_cache = TTLCache(maxsize=100_000)
+ROUTE_CACHE_TTL = 86400.0
+
+# Circuit breaker: after this many consecutive OSRM failures the fallback
+# paths skip straight to the Haversine estimate for the cooldown window,
+# instead of every request paying the full timeout against a down service
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+# /table URL capacity: public OSRM instances reject request URLs past
+# ~8 KB and every coordinate costs ~20 bytes plus index digits, so cap
+# the coordinates per request and chunk anything larger
+TABLE_MAX_COORDS_PER_REQUEST = 200
+
+
+def _route_cache_key(start_lat: float, start_lon: float,
+                     end_lat: float, end_lon: float) -> Tuple:
+    return (
+        "route",
+        round(start_lat, 5), round(start_lon, 5),
+        round(end_lat, 5), round(end_lon, 5)
+    )
+
+
+def _is_retryable_status(exc: BaseException) -> bool:
+    """Retry rate limits and server-side errors; 4xx client errors are final"""
+    return isinstance(exc, httpx.HTTPStatusError) and (
+        exc.response.status_code == 429 or exc.response.status_code >= 500
+    )
+
+
+# Exponential backoff with jitter on 429/5xx responses, same shape as the
+# transient-retry policy on the database layer
+_status_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.5, max=4),
+    retry=retry_if_exception(_is_retryable_status),
+    reraise=True,
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_duration(duration_seconds: int) -> str:
+    """
+    Format duration in a human-readable way.
+    Memoized: OSRM returns integer-ish seconds that cluster heavily across
+    a session, so the repeated int/string formatting on the hot return
+    path collapses to a dict lookup (callers cast to int so float jitter
+    does not defeat the cache).
+
+    Args:
+        duration_seconds: Duration in seconds
+
+    Returns:
+        Formatted duration string
+    """
+    try:
+        if duration_seconds < 60:
+            return f"{int(duration_seconds)}s"
+        elif duration_seconds < 3600:
+            minutes = int(duration_seconds / 60)
+            seconds = int(duration_seconds % 60)
+            return f"{minutes}m {seconds}s" if seconds > 0 else f"{minutes}m"
+        else:
+            hours = int(duration_seconds / 3600)
+            minutes = int((duration_seconds % 3600) / 60)
+            return f"{hours}h {minutes}m" if minutes > 0 else f"{hours}h"
+    except:
+        return "N/A"
+
 
 class OSRMClient:
     """OSRM API client for routing and distance calculations"""
     
     def __init__(self):
         self.base_url = settings.osrm_base_url
-        self.timeout = 30.0
-    
+        # Short timeout by design: the circuit breaker plus the Haversine
+        # fallback make a fast failure strictly better than a slow one
+        self.timeout = 5.0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._breaker = {"failures": 0, "open_until": 0.0}
+        self._breaker_lock = asyncio.Lock()
+        # In-flight /route fetches keyed on rounded coordinates, so
+        # concurrent requests for the same pair share one OSRM call
+        self._inflight: Dict[Tuple, "asyncio.Task"] = {}
+
+    def _breaker_is_open(self) -> bool:
+        """True while the breaker cooldown is active (OSRM known-down)"""
+        return time.monotonic() < self._breaker["open_until"]
+
+    async def _breaker_record(self, success: bool) -> None:
+        """Update breaker state after an OSRM call: a success closes it,
+        consecutive failures past the threshold open it for the cooldown"""
+        async with self._breaker_lock:
+            if success:
+                self._breaker["failures"] = 0
+                return
+            self._breaker["failures"] += 1
+            if self._breaker["failures"] >= BREAKER_FAILURE_THRESHOLD:
+                self._breaker["open_until"] = time.monotonic() + BREAKER_COOLDOWN_SECONDS
+                logger.warning(
+                    f"OSRM circuit breaker opened after "
+                    f"{self._breaker['failures']} consecutive failures; "
+                    f"using straight-line estimates for "
+                    f"{BREAKER_COOLDOWN_SECONDS:.0f}s"
+                )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client: the TCP (and TLS) handshake is paid once
+        per pooled connection instead of once per request. HTTP/2 is offered
+        via ALPN so deployments fronted by an HTTP/2-capable proxy multiplex
+        concurrent requests over one connection; plain HTTP/1.1 servers are
+        unaffected"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=64,
+                    max_keepalive_connections=64,
+                    keepalive_expiry=300
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled client (called from application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @_status_retry
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET an OSRM endpoint and parse the JSON body, backing off and
+        retrying 429/5xx responses"""
+        response = await self._get_client().get(url, params=params)
+        response.raise_for_status()
+        # orjson parses the numeric-heavy OSRM payloads (a /table response
+        # is mostly float arrays) several times faster than the stdlib
+        # json parser behind response.json()
+        return orjson.loads(response.content)
+
     async def get_route_info(
-        self, 
-        start_lat: float, 
-        start_lon: float, 
-        end_lat: float, 
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
         end_lon: float
     ) -> Dict[str, Any]:
         """
-        Get route information between two points
-        
+        Get route information between two points.
+        Concurrent calls for the same (rounded) coordinate pair are
+        coalesced: the first caller issues the OSRM request, the rest
+        await the same in-flight task instead of duplicating it.
+
         Args:
             start_lat: Starting latitude
             start_lon: Starting longitude
             end_lat: Destination latitude
             end_lon: Destination longitude
-            
+
         Returns:
             Route information including distance and duration
         """
+        key = _route_cache_key(start_lat, start_lon, end_lat, end_lon)
+        task = self._inflight.get(key)
+        if task is None:
+            # No lock needed: there is no await between the lookup above
+            # and this insert, so the check-and-set is atomic on the loop
+            task = asyncio.create_task(
+                self._fetch_route_info(start_lat, start_lon, end_lat, end_lon)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, key=key: self._inflight.pop(key, None))
+        # shield() so one cancelled caller cannot cancel the shared fetch
+        # out from under the others
+        return await asyncio.shield(task)
+
+    async def _fetch_route_info(
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float
+    ) -> Dict[str, Any]:
+        """Uncoalesced /route fetch behind get_route_info; never raises -
+        failures come back as error dicts. Breaker state is recorded here,
+        on the actual OSRM call, so cache hits never touch the failure
+        counter and an outage cannot be masked by warm keys."""
+        result = await self._fetch_route_info_raw(start_lat, start_lon, end_lat, end_lon)
+        await self._breaker_record(result.get("success", False))
+        return result
+
+    async def _fetch_route_info_raw(
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float
+    ) -> Dict[str, Any]:
         try:
             # Construct OSRM route URL
             url = f"{self.base_url}/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}"
@@ -48,36 +232,32 @@ class OSRMClient:
                 "geometries": "geojson"
             }
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if data.get("code") != "Ok":
-                    raise ValueError(f"OSRM API error: {data.get('message', 'Unknown error')}")
-                
-                routes = data.get("routes", [])
-                if not routes:
-                    raise ValueError("No routes found")
-                
-                route = routes[0]  # Take the first route
-                geometry = route.get("geometry")  # GeoJSON LineString
-                # Extract route information
-                distance_meters = route.get("distance", 0)
-                duration_seconds = route.get("duration", 0)
-                return {
-                    "success": True,
-                    "distance_meters": distance_meters,
-                    "distance_km": round(distance_meters / 1000, 2),
-                    "duration_seconds": duration_seconds,
-                    "duration_minutes": round(duration_seconds / 60, 1),
-                    "duration_hours": round(duration_seconds / 3600, 2),
-                    "formatted_duration": self._format_duration(duration_seconds),
-                    "start_coordinates": [start_lat, start_lon],
-                    "end_coordinates": [end_lat, end_lon],
-                    "geometry": geometry
-                }
+            data = await self._get_json(url, params=params)
+
+            if data.get("code") != "Ok":
+                raise ValueError(f"OSRM API error: {data.get('message', 'Unknown error')}")
+
+            routes = data.get("routes", [])
+            if not routes:
+                raise ValueError("No routes found")
+
+            route = routes[0]  # Take the first route
+            geometry = route.get("geometry")  # GeoJSON LineString
+            # Extract route information
+            distance_meters = route.get("distance", 0)
+            duration_seconds = route.get("duration", 0)
+            return {
+                "success": True,
+                "distance_meters": distance_meters,
+                "distance_km": round(distance_meters / 1000, 2),
+                "duration_seconds": duration_seconds,
+                "duration_minutes": round(duration_seconds / 60, 1),
+                "duration_hours": round(duration_seconds / 3600, 2),
+                "formatted_duration": _format_duration(int(duration_seconds)),
+                "start_coordinates": [start_lat, start_lon],
+                "end_coordinates": [end_lat, end_lon],
+                "geometry": geometry
+            }
                 
         except httpx.TimeoutException:
             logger.error("OSRM request timeout")
@@ -110,55 +290,250 @@ class OSRMClient:
                 "duration_minutes": None
             }
     
-    async def get_distance_matrix(
-        self, 
-        sources: List[Tuple[float, float]], 
+    async def get_routes_one_to_many(
+        self,
+        start_lat: float,
+        start_lon: float,
         destinations: List[Tuple[float, float]]
-    ) -> Dict[str, Any]:
+    ) -> List[Dict[str, Any]]:
         """
-        Get distance matrix between multiple points
-        
+        Get distance and duration from one source to many destinations in a
+        single /table request, instead of one /route round-trip per
+        destination. OSRM shares graph traversal work across the whole set.
+
         Args:
-            sources: List of (lat, lon) tuples for source points
+            start_lat: Starting latitude
+            start_lon: Starting longitude
             destinations: List of (lat, lon) tuples for destination points
-            
+
         Returns:
-            Distance matrix with durations and distances
+            One dict per destination, in input order, shaped like
+            get_route_info output (geometry is None - the table service
+            does not return route shapes)
         """
+        # A single URL cannot hold arbitrarily many coordinates: past the
+        # cap, split the destination list, fan the sub-requests out
+        # concurrently under the usual in-flight limit, and stitch the
+        # per-chunk results back together in input order
+        if len(destinations) + 1 > TABLE_MAX_COORDS_PER_REQUEST:
+            step = TABLE_MAX_COORDS_PER_REQUEST - 1
+            sem = asyncio.Semaphore(settings.osrm_concurrency)
+
+            async def _part(chunk: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+                async with sem:
+                    return await self.get_routes_one_to_many(start_lat, start_lon, chunk)
+
+            parts = await asyncio.gather(*(
+                _part(destinations[i:i + step])
+                for i in range(0, len(destinations), step)
+            ))
+            return [result for part in parts for result in part]
+
         try:
-            # Convert coordinates to OSRM format (lon,lat)
-            source_coords = ";".join([f"{lon},{lat}" for lat, lon in sources])
-            dest_coords = ";".join([f"{lon},{lat}" for lat, lon in destinations])
-            
-            # If sources and destinations are the same, we only need one coordinate string
-            if sources == destinations:
-                coords = source_coords
-                url = f"{self.base_url}/table/v1/driving/{coords}"
-            else:
-                coords = f"{source_coords};{dest_coords}"
-                source_indices = list(range(len(sources)))
-                dest_indices = list(range(len(sources), len(sources) + len(destinations)))
-                url = f"{self.base_url}/table/v1/driving/{coords}"
-                url += f"?sources={';'.join(map(str, source_indices))}"
-                url += f"&destinations={';'.join(map(str, dest_indices))}"
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if data.get("code") != "Ok":
-                    raise ValueError(f"OSRM API error: {data.get('message', 'Unknown error')}")
-                
-                return {
+            coords = f"{start_lon},{start_lat};" + ";".join(
+                f"{lon},{lat}" for lat, lon in destinations
+            )
+            url = f"{self.base_url}/table/v1/driving/{coords}"
+            params = {
+                "sources": "0",
+                "annotations": "duration,distance"
+            }
+
+            data = await self._get_json(url, params=params)
+
+            if data.get("code") != "Ok":
+                raise ValueError(f"OSRM API error: {data.get('message', 'Unknown error')}")
+
+            durations = data.get("durations", [[]])[0]
+            distances = data.get("distances", [[]])[0]
+
+            results = []
+            for i, (end_lat, end_lon) in enumerate(destinations):
+                duration_seconds = durations[i] if i < len(durations) else None
+                distance_meters = distances[i] if i < len(distances) else None
+                if duration_seconds is None or distance_meters is None:
+                    # Unroutable destination (e.g. off-network coordinates)
+                    results.append({
+                        "success": False,
+                        "error": "No route found",
+                        "distance_meters": None,
+                        "distance_km": None,
+                        "duration_seconds": None,
+                        "duration_minutes": None
+                    })
+                    continue
+                results.append({
                     "success": True,
-                    "durations": data.get("durations", []),
-                    "distances": data.get("distances", []),
-                    "sources": sources,
-                    "destinations": destinations
+                    "distance_meters": distance_meters,
+                    "distance_km": round(distance_meters / 1000, 2),
+                    "duration_seconds": duration_seconds,
+                    "duration_minutes": round(duration_seconds / 60, 1),
+                    "duration_hours": round(duration_seconds / 3600, 2),
+                    "formatted_duration": _format_duration(int(duration_seconds)),
+                    "start_coordinates": [start_lat, start_lon],
+                    "end_coordinates": [end_lat, end_lon],
+                    "geometry": None
+                })
+            return results
+
+        except Exception as e:
+            logger.error(f"OSRM one-to-many request error: {e}")
+            return [
+                {
+                    "success": False,
+                    "error": str(e),
+                    "distance_meters": None,
+                    "distance_km": None,
+                    "duration_seconds": None,
+                    "duration_minutes": None
                 }
-                
+                for _ in destinations
+            ]
+
+    async def _route_info_cached(
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float
+    ) -> Dict[str, Any]:
+        """Memoized get_route_info. Concurrent callers on a cold key share
+        one fetch; failed lookups are evicted so an OSRM hiccup is not
+        pinned for the full TTL."""
+        key = _route_cache_key(start_lat, start_lon, end_lat, end_lon)
+        result = await _route_cache.get_or_set(
+            key, ROUTE_CACHE_TTL,
+            lambda: self.get_route_info(start_lat, start_lon, end_lat, end_lon)
+        )
+        if not result.get("success", False):
+            _route_cache.delete(key)
+        return result
+
+    async def get_routes_bulk(
+        self,
+        pairs: List[Tuple[float, float, float, float]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch per-pair /route results concurrently.
+        For callers that still need full route detail (geometry) per pair,
+        where the /table batching does not apply: wall time drops from the
+        sum of the latencies to roughly the slowest one, with in-flight
+        requests capped so a large fan-out cannot exhaust sockets or trip
+        the routing service's rate limits.
+
+        Args:
+            pairs: List of (start_lat, start_lon, end_lat, end_lon) tuples
+
+        Returns:
+            One route dict per pair, in input order
+        """
+        sem = asyncio.Semaphore(settings.osrm_concurrency)
+
+        async def _one(pair: Tuple[float, float, float, float]) -> Dict[str, Any]:
+            async with sem:
+                return await self.get_route_info(*pair)
+
+        return await asyncio.gather(*(_one(p) for p in pairs))
+
+    async def _table_chunk(
+        self,
+        src: np.ndarray,
+        dst: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One /table request for a source/destination block that fits in a
+        single URL. Returns (durations, distances) float32 arrays of shape
+        (len(src), len(dst)); raises on OSRM errors so callers decide how
+        to surface them.
+        """
+        # OSRM format is lon,lat; 6 decimal places is ~0.1 m, below OSRM's
+        # snapping resolution
+        source_coords = ";".join(f"{lon:.6f},{lat:.6f}" for lat, lon in src)
+        dest_coords = ";".join(f"{lon:.6f},{lat:.6f}" for lat, lon in dst)
+
+        # annotations is mandatory: /table returns durations only by default
+        params: Dict[str, Any] = {"annotations": "duration,distance"}
+
+        # If sources and destinations are the same, we only need one coordinate string
+        if np.array_equal(src, dst):
+            url = f"{self.base_url}/table/v1/driving/{source_coords}"
+        else:
+            coords = f"{source_coords};{dest_coords}"
+            url = f"{self.base_url}/table/v1/driving/{coords}"
+            params["sources"] = ";".join(map(str, range(len(src))))
+            params["destinations"] = ";".join(map(str, range(len(src), len(src) + len(dst))))
+
+        data = await self._get_json(url, params=params)
+
+        if data.get("code") != "Ok":
+            raise ValueError(f"OSRM API error: {data.get('message', 'Unknown error')}")
+
+        return (
+            np.asarray(data.get("durations", []), dtype=np.float32),
+            np.asarray(data.get("distances", []), dtype=np.float32)
+        )
+
+    async def get_distance_matrix(
+        self,
+        sources: "List[Tuple[float, float]] | np.ndarray",
+        destinations: "List[Tuple[float, float]] | np.ndarray"
+    ) -> Dict[str, Any]:
+        """
+        Get distance matrix between multiple points
+
+        Args:
+            sources: (lat, lon) source points - list of tuples or (N, 2) array
+            destinations: (lat, lon) destination points, same shapes accepted
+
+        Returns:
+            Distance matrix with durations and distances as (N, M) float32
+            arrays (NaN where OSRM reports an unroutable pair)
+        """
+        try:
+            # Normalize once to contiguous (N, 2) float64: one flat buffer
+            # instead of N boxed tuples, shared by the URL build and by the
+            # vectorized haversine/array paths callers layer on top
+            src = np.ascontiguousarray(sources, dtype=np.float64).reshape(-1, 2)
+            dst = np.ascontiguousarray(destinations, dtype=np.float64).reshape(-1, 2)
+
+            if len(src) + len(dst) <= TABLE_MAX_COORDS_PER_REQUEST:
+                durations, distances = await self._table_chunk(src, dst)
+            else:
+                # Too many coordinates for one URL: tile the matrix into
+                # sub-requests that each fit, dispatch them concurrently
+                # under the usual in-flight cap, and stitch the blocks back
+                # into the full (N, M) result
+                row_step = min(len(src), max(1, TABLE_MAX_COORDS_PER_REQUEST // 2))
+                col_step = max(1, TABLE_MAX_COORDS_PER_REQUEST - row_step)
+
+                durations = np.empty((len(src), len(dst)), dtype=np.float32)
+                distances = np.empty((len(src), len(dst)), dtype=np.float32)
+                sem = asyncio.Semaphore(settings.osrm_concurrency)
+
+                async def _fill(r0: int, c0: int) -> None:
+                    r1 = min(r0 + row_step, len(src))
+                    c1 = min(c0 + col_step, len(dst))
+                    async with sem:
+                        block = await self._table_chunk(src[r0:r1], dst[c0:c1])
+                    durations[r0:r1, c0:c1] = block[0]
+                    distances[r0:r1, c0:c1] = block[1]
+
+                await asyncio.gather(*(
+                    _fill(r0, c0)
+                    for r0 in range(0, len(src), row_step)
+                    for c0 in range(0, len(dst), col_step)
+                ))
+
+            # Hand the matrices over as float32 arrays (nulls become NaN) so
+            # downstream filtering/sorting never iterates nested Python lists
+            return {
+                "success": True,
+                "durations": durations,
+                "distances": distances,
+                "sources": src.tolist(),
+                "destinations": dst.tolist()
+            }
+
         except Exception as e:
             logger.error(f"OSRM distance matrix error: {e}")
             return {
@@ -168,30 +543,6 @@ class OSRMClient:
                 "distances": []
             }
     
-    def _format_duration(self, duration_seconds: float) -> str:
-        """
-        Format duration in a human-readable way
-        
-        Args:
-            duration_seconds: Duration in seconds
-            
-        Returns:
-            Formatted duration string
-        """
-        try:
-            if duration_seconds < 60:
-                return f"{int(duration_seconds)}s"
-            elif duration_seconds < 3600:
-                minutes = int(duration_seconds / 60)
-                seconds = int(duration_seconds % 60)
-                return f"{minutes}m {seconds}s" if seconds > 0 else f"{minutes}m"
-            else:
-                hours = int(duration_seconds / 3600)
-                minutes = int((duration_seconds % 3600) / 60)
-                return f"{hours}h {minutes}m" if minutes > 0 else f"{hours}h"
-        except:
-            return "N/A"
-    
     def calculate_straight_line_distance(
         self, 
         lat1: float, 
@@ -210,21 +561,9 @@ class OSRMClient:
         Returns:
             Distance in kilometers
         """
-        import math
-        
-        # Convert latitude and longitude from degrees to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        # Radius of earth in kilometers
-        r = 6371
-        
-        return c * r
+        # Delegates to the geo kernel, which is Numba-compiled to native
+        # code when numba is installed
+        return haversine_km(lat1, lon1, lat2, lon2)
     
     async def get_route_with_fallback(
         self, 
@@ -245,36 +584,91 @@ class OSRMClient:
         Returns:
             Route information with fallback calculation
         """
-        # Try OSRM first
-        route_info = await self.get_route_info(start_lat, start_lon, end_lat, end_lon)
-        
+        # Skip OSRM entirely while the breaker is open - during an outage
+        # every request would otherwise eat the full client timeout
+        if self._breaker_is_open():
+            return self._straight_line_estimate(start_lat, start_lon, end_lat, end_lon)
+
+        # Try OSRM first (memoized on rounded coordinates); breaker state
+        # is tracked inside the fetch, not here, so cache hits do not
+        # reset the failure counter
+        route_info = await self._route_info_cached(start_lat, start_lon, end_lat, end_lon)
+
         if route_info.get("success", False):
             return route_info
-        
+
         # Fallback to straight-line distance
+        return self._straight_line_estimate(start_lat, start_lon, end_lat, end_lon)
+
+    @staticmethod
+    def haversine_bulk(
+        lat1: float,
+        lon1: float,
+        lats: np.ndarray,
+        lons: np.ndarray
+    ) -> np.ndarray:
+        """
+        Haversine distance from one point to many, vectorized.
+        One NumPy call computes the whole array in C loops instead of paying
+        interpreter and math-module overhead per pair. Runs in float32
+        (accuracy floor ~1e-3 km, far below routing thresholds).
+
+        Args:
+            lat1, lon1: Source coordinates
+            lats, lons: Destination coordinate arrays (degrees)
+
+        Returns:
+            Distances in kilometers (float32), one per destination
+        """
+        return haversine_km_array(
+            lat1, lon1,
+            np.ascontiguousarray(lats, dtype=np.float32),
+            np.ascontiguousarray(lons, dtype=np.float32)
+        )
+
+    def _estimate_dict(
+        self,
+        straight_distance: float,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float
+    ) -> Dict[str, Any]:
+        """Shape a straight-line distance into the fallback route dict with
+        drive time estimated at a 50 km/h average"""
+        estimated_duration_hours = straight_distance / 50
+        estimated_duration_seconds = estimated_duration_hours * 3600
+
+        return {
+            "success": True,
+            "fallback": True,
+            "distance_meters": straight_distance * 1000,
+            "distance_km": round(straight_distance, 2),
+            "duration_seconds": estimated_duration_seconds,
+            "duration_minutes": round(estimated_duration_seconds / 60, 1),
+            "duration_hours": round(estimated_duration_hours, 2),
+            "formatted_duration": _format_duration(int(estimated_duration_seconds)),
+            "start_coordinates": [start_lat, start_lon],
+            "end_coordinates": [end_lat, end_lon],
+            "note": "Estimated based on straight-line distance (routing service unavailable)"
+        }
+
+    def _straight_line_estimate(
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float
+    ) -> Dict[str, Any]:
+        """Build the straight-line fallback route dict for a single pair"""
         try:
             straight_distance = self.calculate_straight_line_distance(
                 start_lat, start_lon, end_lat, end_lon
             )
-            
-            # Estimate driving time (assuming average speed of 50 km/h)
-            estimated_duration_hours = straight_distance / 50
-            estimated_duration_seconds = estimated_duration_hours * 3600
-            
-            return {
-                "success": True,
-                "fallback": True,
-                "distance_meters": straight_distance * 1000,
-                "distance_km": round(straight_distance, 2),
-                "duration_seconds": estimated_duration_seconds,
-                "duration_minutes": round(estimated_duration_seconds / 60, 1),
-                "duration_hours": round(estimated_duration_hours, 2),
-                "formatted_duration": self._format_duration(estimated_duration_seconds),
-                "start_coordinates": [start_lat, start_lon],
-                "end_coordinates": [end_lat, end_lon],
-                "note": "Estimated based on straight-line distance (routing service unavailable)"
-            }
-            
+            return self._estimate_dict(
+                straight_distance, start_lat, start_lon, end_lat, end_lon
+            )
+
         except Exception as e:
             logger.error(f"Fallback distance calculation failed: {e}")
             return {
@@ -286,6 +680,130 @@ class OSRMClient:
                 "duration_minutes": None
             }
 
+    async def get_routes_with_fallback_one_to_many(
+        self,
+        start_lat: float,
+        start_lon: float,
+        destinations: List[Tuple[float, float]]
+    ) -> List[Dict[str, Any]]:
+        """
+        One-to-many route lookup with the same straight-line fallback
+        semantics as get_route_with_fallback, applied per destination.
+        One /table request covers the whole destination set; any entry OSRM
+        cannot route falls back to the Haversine estimate individually.
+
+        Args:
+            start_lat: Starting latitude
+            start_lon: Starting longitude
+            destinations: List of (lat, lon) tuples for destination points
+
+        Returns:
+            One route dict per destination, in input order
+        """
+        if not destinations:
+            return []
+
+        # Serve warm destinations from the memo cache and fetch only the
+        # misses; successful fetches are stored for the next request (the
+        # fallback estimates are not - OSRM may come back)
+        keys = [
+            _route_cache_key(start_lat, start_lon, end_lat, end_lon)
+            for end_lat, end_lon in destinations
+        ]
+        results: List[Optional[Dict[str, Any]]] = [_route_cache.get(key) for key in keys]
+
+        miss_idx = [i for i, route_info in enumerate(results) if route_info is None]
+        if miss_idx:
+            fallback_idx = []
+            if self._breaker_is_open():
+                # OSRM is known-down: send every miss straight to the
+                # Haversine estimate instead of paying the timeout
+                fallback_idx = miss_idx
+            else:
+                fetched = await self.get_routes_one_to_many(
+                    start_lat, start_lon, [destinations[i] for i in miss_idx]
+                )
+                for i, route_info in zip(miss_idx, fetched):
+                    if route_info.get("success", False):
+                        _route_cache.set(keys[i], ROUTE_CACHE_TTL, route_info)
+                        results[i] = route_info
+                    else:
+                        fallback_idx.append(i)
+                # The whole batch is one OSRM call: count it as a single
+                # success or failure against the breaker
+                await self._breaker_record(len(fallback_idx) < len(miss_idx))
+
+            if fallback_idx:
+                # One vectorized haversine call covers every fallback entry
+                distances = self.haversine_bulk(
+                    start_lat, start_lon,
+                    np.array([destinations[i][0] for i in fallback_idx]),
+                    np.array([destinations[i][1] for i in fallback_idx])
+                )
+                for i, straight_distance in zip(fallback_idx, distances):
+                    end_lat, end_lon = destinations[i]
+                    results[i] = self._estimate_dict(
+                        float(straight_distance), start_lat, start_lon, end_lat, end_lon
+                    )
+
+        return results
+
+    async def get_best_facilities(
+        self,
+        user_lat: float,
+        user_lon: float,
+        facilities: List[Dict[str, Any]],
+        top_k: int = 10,
+        haversine_cutoff_km: float = 500.0
+    ) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Rank facilities by driving distance, pre-filtered by straight-line
+        distance. A route can never be shorter than the great-circle
+        distance, so anything past the cutoff is dropped before OSRM is
+        asked, and only the top_k*3 nearest survivors go into the batched
+        /table lookup - far-away facilities stop costing routing work.
+
+        Args:
+            user_lat, user_lon: User coordinates
+            facilities: Facility dicts with "latitude"/"longitude" keys
+            top_k: Number of facilities to return
+            haversine_cutoff_km: Straight-line distance cutoff for candidates
+
+        Returns:
+            Up to top_k (facility, route_info) pairs sorted by driving
+            distance (nearest first)
+        """
+        candidates = [
+            f for f in facilities
+            if f.get("latitude") and f.get("longitude")
+        ]
+        if not candidates:
+            return []
+
+        # One vectorized pass scores every candidate
+        straight_km = self.haversine_bulk(
+            user_lat, user_lon,
+            np.array([f["latitude"] for f in candidates]),
+            np.array([f["longitude"] for f in candidates])
+        )
+        order = np.argsort(straight_km)
+        shortlist = [
+            candidates[i] for i in order
+            if straight_km[i] <= haversine_cutoff_km
+        ][:top_k * 3]
+        if not shortlist:
+            return []
+
+        route_infos = await self.get_routes_with_fallback_one_to_many(
+            user_lat, user_lon,
+            [(f["latitude"], f["longitude"]) for f in shortlist]
+        )
+        ranked = sorted(
+            zip(shortlist, route_infos),
+            key=lambda pair: pair[1].get("distance_km") or float("inf")
+        )
+        return ranked[:top_k]
+
 
 # Global OSRM client instance
 osrm_client = None
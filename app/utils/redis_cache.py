@@ -0,0 +1,83 @@
+"""
+Redis caching utilities for VenomX.
+Provides an optional redis.asyncio client for serving hot read paths
+(e.g. facility lookups) from memory instead of the database.
+"""
+
+import logging
+from typing import Any, Optional
+
+import orjson
+
+from app.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    # Redis is optional - the app degrades to direct DB reads without it
+    aioredis = None
+
+# Cache key layout and TTLs
+FACILITIES_SNAKE_KEY = "facilities:snake:{snake_id}"
+FACILITIES_CACHE_TTL = 60  # seconds - stock changes are rare relative to reads
+INVALIDATION_CHANNEL = "venomx:cache-invalidate"
+
+# Global Redis client
+_redis_client = None
+
+
+def get_redis():
+    """Get or create the global Redis client (None when Redis is unavailable)"""
+    global _redis_client
+    if _redis_client is None and aioredis is not None:
+        try:
+            _redis_client = aioredis.from_url(settings.redis_url)
+            logger.info(f"Redis client initialized for {settings.redis_url}")
+        except Exception as e:
+            logger.warning(f"Failed to initialize Redis client: {e}")
+    return _redis_client
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Get a cached value by key, or None on miss/unavailable cache"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        cached = await client.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"Redis GET failed for {key}: {e}")
+    return None
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Cache a JSON-serializable value with a TTL (best-effort)"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, orjson.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Redis SET failed for {key}: {e}")
+
+
+async def invalidate_facilities_cache(snake_id: int) -> None:
+    """
+    Invalidate the cached facility list for a snake.
+    Call this from stock-update paths so readers see fresh quantities;
+    also publishes the key so other instances can drop their entries.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    key = FACILITIES_SNAKE_KEY.format(snake_id=snake_id)
+    try:
+        await client.delete(key)
+        await client.publish(INVALIDATION_CHANNEL, key)
+        logger.info(f"Invalidated facilities cache for snake_id {snake_id}")
+    except Exception as e:
+        logger.warning(f"Redis invalidation failed for {key}: {e}")
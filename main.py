@@ -3,16 +3,28 @@ VenomX FastAPI Backend Server
 Main application entry point for snake identification and antivenom finder service.
 """
 
+import asyncio
 import os
 import logging
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, Request, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
+from supabase import acreate_client
+
 from app.routers import snake_id, antivenom
-from app.utils.db import init_db
+import app.utils.db as db_module
+import app.utils.osrm as osrm_module
+from app.utils.db import init_db, db_manager, get_db_concurrency_stats
+from app.utils.detector import get_detector, cleanup_temp_files
+from app.utils.detector_batcher import get_detector_batcher
+from app.utils.classifier import get_classifier
 from app.utils.config import settings
 
 # Configure logging
@@ -22,43 +34,97 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Application lifespan context manager.
-    Handles startup and shutdown events.
-    """
-    # Startup
-    logger.info("Starting VenomX FastAPI server...")
-    
-    # Initialize database connection
+# Coordinate pairs spread across the service region; routing between them
+# pulls the relevant OSRM graph tiles into the kernel page cache so the
+# first real user request is not punished by cold-disk I/O.
+_OSRM_WARMUP_ROUTES = [
+    ((14.5995, 120.9842), (14.6760, 121.0437)),   # Manila -> Quezon City
+    ((14.5995, 120.9842), (16.4023, 120.5960)),   # Manila -> Baguio
+    ((10.3157, 123.8854), (10.7202, 122.5621)),   # Cebu -> Iloilo
+    ((7.1907, 125.4553), (8.4542, 124.6319)),     # Davao -> Cagayan de Oro
+    ((13.6218, 123.1948), (14.5995, 120.9842)),   # Naga -> Manila
+    ((6.9214, 122.0790), (7.1907, 125.4553)),     # Zamboanga -> Davao
+    ((18.1960, 120.5927), (16.4023, 120.5960)),   # Laoag -> Baguio
+    ((11.2404, 125.0046), (10.3157, 123.8854)),   # Tacloban -> Cebu
+    ((9.3068, 123.3054), (10.3157, 123.8854)),    # Dumaguete -> Cebu
+    ((15.4755, 120.5963), (14.5995, 120.9842)),   # Tarlac -> Manila
+]
+
+async def _warm_osrm():
+    """Issue a handful of spread-out route requests at startup so OSRM's
+    page cache is warm before the first user query. Failures are logged
+    and ignored - a missing OSRM instance must not block startup."""
+    client = osrm_module.get_osrm_client()
+    for (start_lat, start_lon), (end_lat, end_lon) in _OSRM_WARMUP_ROUTES:
+        try:
+            started = time.monotonic()
+            await client.get_route_info(start_lat, start_lon, end_lat, end_lon)
+            logger.info(
+                f"OSRM warmup route took {(time.monotonic() - started) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            logger.warning(f"OSRM warmup request failed: {e}")
+
+async def _sweep_orphan_crops(interval_seconds: int = 3600):
+    """Hourly sweep for crop files no request claimed (crash leftovers).
+    Per-request crops are deleted by SnakeDetector.finalize_request."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        cleanup_temp_files()
+
+async def _init_storage():
+    """Bring up the database layer: asyncpg pool first, Supabase-only as
+    fallback. Imports are resolved at module load, so this is pure
+    connection work with no import-lock traffic during startup."""
     try:
         await init_db()
         logger.info("Database connection initialized successfully")
     except Exception as e:
         logger.warning(f"PostgreSQL pool initialization failed: {e}")
         logger.info("Continuing with Supabase client only...")
-        
+
         # Initialize just the Supabase client
         try:
-            from supabase import create_client
-            from app.utils.config import settings
-            
-            # Set global supabase client
-            import app.utils.db as db_module
-            db_module.supabase = create_client(settings.supabase_url, settings.supabase_service_key)
-            logger.info("Supabase client initialized successfully")
+            db_module.supabase = await acreate_client(settings.supabase_url, settings.supabase_service_key)
+            logger.info("Supabase async client initialized successfully")
         except Exception as supabase_error:
             logger.error(f"Supabase initialization also failed: {supabase_error}")
             # Continue anyway - some endpoints might still work
-    
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan context manager.
+    Handles startup and shutdown events.
+    """
+    # Startup
+    logger.info("Starting VenomX FastAPI server...")
+
+    await _init_storage()
+
     # Create temp directory if it doesn't exist
     os.makedirs("temp", exist_ok=True)
     logger.info("Temporary directory created/verified")
-    
+
+    # Size the default executor explicitly: it serves the offloaded
+    # detector/classifier calls and image decodes, and the stdlib default
+    # (cpu_count + 4) oversubscribes cores with pure CPU work
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+    )
+
+    sweep_task = asyncio.create_task(_sweep_orphan_crops())
+    # Hold the reference: the loop only keeps tasks weakly, so an
+    # anonymous warmup task could be garbage-collected mid-flight
+    warm_task = asyncio.create_task(_warm_osrm())
+
     yield
-    
+
     # Shutdown
+    sweep_task.cancel()
+    warm_task.cancel()
+    if osrm_module.osrm_client is not None:
+        await osrm_module.osrm_client.aclose()
     logger.info("Shutting down VenomX FastAPI server...")
 
 # Initialize FastAPI app
@@ -68,7 +134,10 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes large facility/snake lists (including date/datetime
+    # fields) in C instead of re-walking every dict in the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -90,7 +159,6 @@ app.include_router(antivenom.router, prefix="/api/v1", tags=["Antivenom Finder"]
 @app.get("/")
 async def root():
     """Root endpoint - redirect to snake tester"""
-    from fastapi.responses import RedirectResponse
     return RedirectResponse(url="/static/snake_tester.html")
 
 @app.get("/health")
@@ -103,6 +171,23 @@ async def health_check():
         "docs": "/docs"
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Lightweight observability endpoint: database concurrency/pool state"""
+    pool_stats = None
+    if db_module.db_pool is not None:
+        pool_stats = {
+            "size": db_module.db_pool.get_size(),
+            "idle": db_module.db_pool.get_idle_size(),
+            "min_size": db_module.db_pool.get_min_size(),
+            "max_size": db_module.db_pool.get_max_size()
+        }
+
+    return {
+        "db_concurrency": get_db_concurrency_stats(),
+        "db_pool": pool_stats
+    }
+
 @app.post("/test-model")
 async def test_snake_model_direct(image: UploadFile = File(...)):
     """
@@ -110,10 +195,6 @@ async def test_snake_model_direct(image: UploadFile = File(...)):
     This matches the working web app implementation.
     """
     try:
-        from app.utils.detector import get_detector, cleanup_temp_files
-        from app.utils.classifier import get_classifier
-        import tempfile
-        
         # Validate file
         if not image.content_type.startswith('image/'):
             raise HTTPException(
@@ -134,15 +215,17 @@ async def test_snake_model_direct(image: UploadFile = File(...)):
         }
         
         try:
-            # Save temporary image
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
-                temp_file.write(image_data)
-                temp_path = temp_file.name
-            
+            # Per-request key for the detector's debug-crop registry (the
+            # image itself stays in memory - no tempfile round trip)
+            request_key = f"upload-{uuid.uuid4().hex}"
+
             try:
                 # Step 1: Detect snake with OBB and perspective transform
-                detector = get_detector()
-                detection_result = detector.detect_snake(temp_path)
+                # (through the micro-batcher so concurrent uploads share one
+                # forward pass and inference runs off the event loop)
+                detection_result = await get_detector_batcher().detect_snake_bytes(
+                    image_data, request_key
+                )
                 
                 if detection_result["success"] and detection_result["detections"]:
                     result["detection_success"] = True
@@ -157,9 +240,14 @@ async def test_snake_model_direct(image: UploadFile = File(...)):
                     }
                     
                     # Step 2: Classify the perspective-corrected crop
-                    cropped_path = best_detection["cropped_image_path"]
+                    # (in-memory array; falls back to the debug file if set)
+                    crop = best_detection.get("cropped_image")
+                    if crop is None:
+                        crop = best_detection["cropped_image_path"]
                     classifier = get_classifier()
-                    classification_result = classifier.classify(cropped_path)
+                    # Classification is sync CPU/GPU work - run it on the
+                    # thread pool so it does not stall the event loop
+                    classification_result = await asyncio.to_thread(classifier.classify, crop)
                     
                     if classification_result["success"]:
                         species_name = classification_result["predicted_class"]
@@ -167,7 +255,6 @@ async def test_snake_model_direct(image: UploadFile = File(...)):
                         result["confidence"] = classification_result["confidence"]
                         
                         # Step 3: Look up snake in database to get reference image and details
-                        from app.utils.db import db_manager
                         snake_data = None
                         try:
                             # Look up snake by common name (which matches the predicted class)
@@ -217,16 +304,15 @@ async def test_snake_model_direct(image: UploadFile = File(...)):
                     }
                 
             finally:
-                # Cleanup temporary files
+                # Delete only this request's crops; concurrent uploads
+                # may still be reading theirs
                 try:
-                    os.unlink(temp_path)
-                    cleanup_temp_files()
+                    get_detector().finalize_request(request_key)
                 except:
                     pass
                     
         except Exception as model_error:
             logger.error(f"Model processing error: {model_error}")
-            import traceback
             traceback.print_exc()
             result["snake_info"] = {
                 "common_name": "Processing Error",
@@ -240,7 +326,6 @@ async def test_snake_model_direct(image: UploadFile = File(...)):
         
     except Exception as e:
         logger.error(f"Test endpoint error: {e}")
-        import traceback
         traceback.print_exc()
         return {
             "detection_success": False,
@@ -274,5 +359,8 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        # uvloop (shipped with uvicorn[standard]) roughly doubles raw
+        # asyncio throughput on the I/O-bound paths (OSRM, Supabase)
+        loop="uvloop"
     )
\ No newline at end of file
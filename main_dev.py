@@ -125,5 +125,8 @@ if __name__ == "__main__":
         "main_dev:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        # uvloop (shipped with uvicorn[standard]) roughly doubles raw
+        # asyncio throughput on the I/O-bound paths (OSRM, Supabase)
+        loop="uvloop"
     )
\ No newline at end of file
@@ -0,0 +1,22 @@
+-- Indexes backing the hot facility/antivenom lookup paths.
+-- Run with CONCURRENTLY outside a transaction (psql, not a migration
+-- wrapper that opens one) so production reads are not blocked.
+
+-- Join from stock to antivenoms; partial on quantity > 0 so the planner
+-- skips out-of-stock rows before touching the heap. expiration_date in
+-- the key lets the expiry filter resolve from the index.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fas_antivenom_in_stock
+    ON facility_antivenom_stock (antivenom_id, expiration_date)
+    WHERE quantity > 0;
+
+-- Antivenom type filter (get_facilities_by_antivenom_type)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_antivenoms_type_id
+    ON antivenoms (type_id);
+
+-- Snake -> antivenom target lookup (get_facilities_with_antivenom)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ast_snake_id
+    ON antivenom_snake_targets (snake_id);
+
+-- Case-insensitive common-name lookup (get_snake_by_common_name uses ILIKE)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_snakes_common_name_lower
+    ON snakes (LOWER(common_name));
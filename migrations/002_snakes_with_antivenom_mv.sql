@@ -0,0 +1,23 @@
+-- Materialized view behind get_snakes_with_antivenom: precomputes the
+-- "has at least one linked antivenom" membership check so the dropdown
+-- query becomes a plain scan of a small relation.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_snakes_with_antivenom AS
+SELECT s.snake_id,
+       s.scientific_name,
+       s.common_name,
+       s.fang_type,
+       s.description,
+       s.danger_level,
+       s.image_url
+FROM snakes s
+WHERE s.snake_id IN (SELECT snake_id FROM antivenom_snake_targets);
+
+-- Unique index required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_snakes_with_antivenom_id
+    ON mv_snakes_with_antivenom (snake_id);
+
+-- Refresh whenever snakes or antivenom_snake_targets change, or on a
+-- schedule. With pg_cron:
+--   SELECT cron.schedule('refresh-snakes-mv', '*/10 * * * *',
+--       'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_snakes_with_antivenom');
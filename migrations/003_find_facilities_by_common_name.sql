@@ -0,0 +1,60 @@
+-- One-round-trip lookup for the mobile flow: resolve a snake common name
+-- and return its stocked facilities in a single call. Exposed to the
+-- Supabase client via client.rpc('find_facilities_by_common_name', ...).
+
+CREATE OR REPLACE FUNCTION find_facilities_by_common_name(p_name text)
+RETURNS SETOF jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'snake_id', x.snake_id,
+        'facility_id', x.facility_id,
+        'facility_name', x.facility_name,
+        'facility_type', x.facility_type,
+        'region', x.region,
+        'province', x.province,
+        'city_municipality', x.city_municipality,
+        'address', x.address,
+        'latitude', x.latitude,
+        'longitude', x.longitude,
+        'contact_number', x.contact_number,
+        'facility_email', x.facility_email,
+        'antivenom_id', x.antivenom_id,
+        'antivenom_name', x.antivenom_name,
+        'manufacturer', x.manufacturer,
+        'quantity', x.quantity,
+        'expiration_date', x.expiration_date,
+        'batch_no', x.batch_no
+    )
+    FROM (
+        SELECT DISTINCT
+            s.snake_id,
+            f.facility_id,
+            f.facility_name,
+            f.facility_type,
+            f.region,
+            f.province,
+            f.city_municipality,
+            f.address,
+            f.latitude,
+            f.longitude,
+            f.contact_number,
+            f.facility_email,
+            a.antivenom_id,
+            a.product_name AS antivenom_name,
+            a.manufacturer,
+            fas.quantity,
+            fas.expiration_date,
+            fas.batch_no
+        FROM snakes s
+        JOIN antivenom_snake_targets ast ON ast.snake_id = s.snake_id
+        JOIN antivenoms a ON a.antivenom_id = ast.antivenom_id
+        JOIN facility_antivenom_stock fas ON fas.antivenom_id = a.antivenom_id
+        JOIN facilities f ON f.facility_id = fas.facility_id
+        WHERE s.common_name ILIKE p_name
+        AND fas.quantity > 0
+        AND (fas.expiration_date IS NULL OR fas.expiration_date > CURRENT_DATE)
+        ORDER BY f.facility_name
+    ) x
+$$;